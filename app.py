@@ -2,14 +2,53 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
 import os
+import re
+import gc
+import math
+import sys
+import gzip
+import signal
+import socket
+import json
+import time
+import hashlib
+from bisect import bisect_left
+import uuid
+import threading
+import subprocess
+from collections import deque
+from contextlib import asynccontextmanager
 import uvicorn
-from fastapi import FastAPI
-import pickle
-import pandas as pd
-from starlette.responses import RedirectResponse, JSONResponse
-from sklearn.metrics.pairwise import cosine_similarity
+from fastapi import FastAPI, Query
+from pydantic import BaseModel, Field
+import yaml
+import numpy as np
+from starlette.responses import RedirectResponse, JSONResponse, Response
+from src.movieRecommendation.components.ann_index import IVFFlatIndex
+from src.movieRecommendation.components.neighbor_table import NeighborTable
+from src.movieRecommendation.utils.cache import LRUCache
+from src.movieRecommendation.utils.title_search import TitleSearchIndex
+from src.movieRecommendation.utils.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    MetricsRegistry,
+    process_resident_memory_bytes,
+)
+from src.movieRecommendation.utils.embeddings import (
+    load_embeddings,
+    read_embeddings_digest,
+    resolve_embeddings_path,
+    top_k_indices,
+)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # Load in the background so the server binds at once; /health keeps traffic
+    # away until the artifacts are loaded and warmed
+    threading.Thread(target=load_data, daemon=True).start()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Mount templates directory for assets (CSS/JS)
 app.mount("/templates", StaticFiles(directory=os.path.join(os.getcwd(), "templates")), name="templates")
@@ -17,82 +56,493 @@ app.mount("/templates", StaticFiles(directory=os.path.join(os.getcwd(), "templat
 # Setup templates
 templates = Jinja2Templates(directory="templates")
 
-SAVED_EMBEDDING_PATH = "artifacts/model_trainer/movie_embeddings.pkl"
-MOVIE_DATA_PATH = "artifacts/data_preparation/prepared.csv"
-INGESTION_DATA_PATH = "artifacts/data_ingestion/final.csv"
+SAVED_EMBEDDING_PATH = "artifacts/model_trainer/movie_embeddings.npy"
+MOVIE_DATA_PATH = "artifacts/data_preparation/prepared.parquet"
+INGESTION_DATA_PATH = "artifacts/data_ingestion/final.parquet"
+CONFIG_PATH = "config/config.yaml"
+
+
+def load_serving_config():
+    """Read the serving section of config.yaml, letting env variables override it"""
+    serving = {}
+    if os.path.exists(CONFIG_PATH):
+        with open(CONFIG_PATH, "r") as f:
+            serving = (yaml.safe_load(f) or {}).get("serving", {})
+    return {
+        "search_mode": os.environ.get("SEARCH_MODE", serving.get("search_mode", "exact")),
+        "ann_index_path": os.environ.get(
+            "ANN_INDEX_PATH", serving.get("ann_index_path", "artifacts/ann_index/ivf_flat.npz")
+        ),
+        "n_probe": int(os.environ.get("ANN_N_PROBE", serving.get("n_probe", 8))),
+        "neighbor_table_dir": os.environ.get(
+            "NEIGHBOR_TABLE_DIR", serving.get("neighbor_table_dir", "artifacts/neighbor_table")
+        ),
+        "cache_size": int(os.environ.get("CACHE_SIZE", serving.get("cache_size", 4096))),
+        "cache_ttl_seconds": float(
+            os.environ.get("CACHE_TTL_SECONDS", serving.get("cache_ttl_seconds", 3600))
+        ),
+        "workers": resolve_worker_count(os.environ.get("WORKERS", serving.get("workers", 1))),
+    }
+
+
+# cgroup v2 and v1 CPU quota files, as seen from inside a container
+CGROUP_CPU_MAX_PATH = "/sys/fs/cgroup/cpu.max"
+CGROUP_V1_QUOTA_PATHS = ("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+
+def cgroup_cpu_limit():
+    """Return the cgroup CPU quota in cores, or None when there is none or it cannot be read"""
+    try:
+        with open(CGROUP_CPU_MAX_PATH) as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        values = []
+        for path in CGROUP_V1_QUOTA_PATHS:
+            with open(path) as f:
+                values.append(int(f.read()))
+    except (OSError, ValueError):
+        return None
+    quota, period = values
+    return None if quota <= 0 else quota / period
+
+
+def resolve_worker_count(value):
+    """Turn the workers setting into a process count; "auto" means one per usable CPU core"""
+    if str(value).strip().lower() == "auto":
+        if hasattr(os, "sched_getaffinity"):
+            cores = len(os.sched_getaffinity(0))
+        else:
+            cores = os.cpu_count() or 1
+        # The affinity mask ignores container CPU quotas, e.g. --cpus=2 on a 64-core host
+        limit = cgroup_cpu_limit()
+        if limit is not None:
+            cores = min(cores, max(1, math.ceil(limit)))
+        return cores
+    return max(1, int(value))
+
+
+SERVING_CONFIG = load_serving_config()
+
+# Artifacts currently being served. load_data() and finished training jobs
+# replace the whole object at once, so a request never sees half-loaded data.
+state = None
+# What /health reports while state is None: "starting" until the lifespan hook
+# runs, then "loading", "missing" (nothing trained yet) or "failed"
+readiness = {"status": "starting", "load_seconds": None}
+
+# In-process metrics, exposed in the Prometheus text format at /metrics
+METRICS = MetricsRegistry()
+HTTP_REQUESTS = METRICS.counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+HTTP_LATENCY = METRICS.histogram(
+    "http_request_duration_seconds", "HTTP request latency in seconds", ("method", "route")
+)
+RECOMMEND_LATENCY = METRICS.histogram(
+    "recommend_duration_seconds",
+    "content_based_recommend latency by where the neighbors came from",
+    ("source",),
+)
+TITLE_LOOKUPS = METRICS.counter("title_lookups_total", "Title lookups by outcome", ("result",))
+TITLE_LOOKUP_LATENCY = METRICS.histogram(
+    "title_lookup_duration_seconds",
+    "find_movie_index latency in seconds",
+    buckets=(0.000001, 0.000005, 0.00001, 0.00005, 0.0001, 0.0005, 0.001),
+)
+MOVIES_SERIALIZATION = METRICS.histogram(
+    "movies_serialization_seconds",
+    "Time spent serializing /movies bodies: the full catalog at load, pages per request",
+    ("kind",),
+)
+METRICS.gauge(
+    "process_resident_memory_bytes", "Resident memory size in bytes",
+    function=process_resident_memory_bytes,
+)
+METRICS.gauge(
+    "model_loaded", "1 if artifacts are loaded, else 0",
+    function=lambda: 0 if state is None else 1,
+)
+METRICS.gauge(
+    "catalog_movies", "Number of movies in the loaded catalog",
+    function=lambda: None if state is None else len(state.titles),
+)
+METRICS.gauge(
+    "recommendation_cache_entries", "Entries in the recommendation cache",
+    function=lambda: None if state is None else state.cache.stats()["size"],
+)
+METRICS.gauge(
+    "recommendation_cache_hits", "Recommendation cache hits since the artifacts were loaded",
+    function=lambda: None if state is None else state.cache.stats()["hits"],
+)
+METRICS.gauge(
+    "recommendation_cache_misses", "Recommendation cache misses since the artifacts were loaded",
+    function=lambda: None if state is None else state.cache.stats()["misses"],
+)
+
+
+class RequestMetricsMiddleware:
+    """Times every HTTP request by method, route and status as plain ASGI middleware"""
 
-# Global variables to store data
-df = None
-movie_embedding = None
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router records the matched route on the shared scope; route
+            # templates such as /train/{job_id} keep the label set bounded
+            path = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_LATENCY.observe(time.perf_counter() - start, scope["method"], path)
+            HTTP_REQUESTS.inc(scope["method"], path, str(status))
+
+
+app.add_middleware(RequestMetricsMiddleware)
+
+
+def build_title_index(titles):
+    """Map each title (exact and lowercased) to the position of its first row"""
+    exact, lowered = {}, {}
+    for position, title in enumerate(titles):
+        if not isinstance(title, str):
+            continue
+        exact.setdefault(title, position)
+        lowered.setdefault(title.lower(), position)
+    return exact, lowered
+
+
+def build_catalog_arrays(df):
+    """Extract titles and posters (None when missing) as object arrays"""
+    titles = df["title"].to_numpy(dtype=object)
+    posters = None
+    if "poster_path" in df.columns:
+        posters = df["poster_path"].astype(object).where(df["poster_path"].notna(), None)
+        posters = posters.to_numpy(dtype=object)
+    return titles, posters
+
+
+def built_from(artifact, n_rows, embeddings_digest):
+    """Whether an ANN index or neighbor table was computed from the loaded embeddings"""
+    # Matching row counts are not enough: retraining alone keeps the catalog size
+    return (
+        artifact.n_rows == n_rows
+        and embeddings_digest is not None
+        and artifact.source_digest == embeddings_digest
+    )
+
+
+def load_ann_index(n_rows, embeddings_digest):
+    """Load the ANN index when approximate search is enabled, else return None"""
+    if SERVING_CONFIG["search_mode"] != "approximate":
+        return None
+    path = SERVING_CONFIG["ann_index_path"]
+    if not os.path.exists(path):
+        print(f"⚠ ANN index not found at {path}. Falling back to exact search.")
+        return None
+    index = IVFFlatIndex.load(path)
+    if not built_from(index, n_rows, embeddings_digest):
+        print("⚠ ANN index does not match the embeddings. Falling back to exact search.")
+        return None
+    print("✓ ANN index loaded (approximate search enabled)")
+    return index
+
+
+def load_neighbor_table(n_rows, embeddings_digest):
+    """Memory-map the precomputed neighbor table if it matches the embeddings"""
+    table_dir = SERVING_CONFIG["neighbor_table_dir"]
+    try:
+        table = NeighborTable.load(table_dir)
+    except FileNotFoundError:
+        return None
+    if not built_from(table, n_rows, embeddings_digest):
+        print("⚠ Neighbor table does not match the embeddings. Scoring live instead.")
+        return None
+    print(f"✓ Neighbor table loaded (top {table.top_k} precomputed)")
+    return table
+
+
+class MovieCatalog:
+    """Sorted titles plus the pre-serialized /movies response built from them"""
+
+    def __init__(self, titles):
+        self.sorted_titles = sorted(title for title in titles if isinstance(title, str))
+        # Case-insensitive order so prefix filters are two bisects
+        keyed = sorted((title.lower(), title) for title in self.sorted_titles)
+        self.prefix_keys = [key for key, _ in keyed]
+        self.prefix_titles = [title for _, title in keyed]
+        # Same compact encoding JSONResponse would produce, serialized only once
+        with MOVIES_SERIALIZATION.time("catalog"):
+            self.json_body = json.dumps(
+                {"movies": self.sorted_titles, "status": "success"},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            self.gzip_body = gzip.compress(self.json_body)
+        digest = hashlib.sha1(self.json_body).hexdigest()
+        # Strong validators must differ between content codings of the same body
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+
+    def page(self, prefix=None, offset=0, limit=None):
+        """Return one page of titles (optionally matching a prefix) and the match count"""
+        if prefix:
+            key = prefix.lower()
+            start = bisect_left(self.prefix_keys, key)
+            end = bisect_left(self.prefix_keys, key + "\U0010ffff", lo=start)
+            matches = self.prefix_titles[start:end]
+        else:
+            matches = self.sorted_titles
+        stop = None if limit is None else offset + limit
+        return matches[offset:stop], len(matches)
+
+
+class ServingState:
+    """Everything needed to serve recommendations for one set of artifacts"""
+
+    def __init__(self, df, embeddings, ann_index=None, neighbor_table=None):
+        self.df = df
+        self.embeddings = embeddings
+        self.ann_index = ann_index
+        self.neighbor_table = neighbor_table
+        # Title -> row position lookups
+        self.title_index, self.title_index_lower = build_title_index(df["title"].tolist())
+        # Title and poster columns as plain arrays for fancy-indexed response assembly
+        self.titles, self.posters = build_catalog_arrays(df)
+        self.catalog = MovieCatalog(self.titles)
+        self.search_index = TitleSearchIndex(self.catalog.prefix_keys, self.catalog.prefix_titles)
+        # Recommendations keyed by (movie row, N); every new state starts empty
+        self.cache = LRUCache(
+            max_size=SERVING_CONFIG["cache_size"],
+            ttl_seconds=SERVING_CONFIG["cache_ttl_seconds"],
+        )
+
+    def warm(self):
+        """Score one movie against the catalog so the first request does not page in the embeddings"""
+        if len(self.titles):
+            self.embeddings @ self.embeddings[0]
 
 
 # Load the movie dataframe and embeddings if they exist
-def load_data():
-    global df, movie_embedding
+def load_state():
+    """Build a ServingState from the artifacts on disk, or return None"""
+    # pandas/pyarrow are only needed here, so importing app stays fast
+    from src.movieRecommendation.utils.tables import read_table, resolve_table_path, table_columns
+
     try:
-        if os.path.exists(MOVIE_DATA_PATH) and os.path.exists(SAVED_EMBEDDING_PATH):
-            df = pd.read_csv(MOVIE_DATA_PATH)
+        if resolve_table_path(MOVIE_DATA_PATH) and resolve_embeddings_path(SAVED_EMBEDDING_PATH):
+            # Serving needs only the titles; the descriptions stay on disk
+            df = read_table(MOVIE_DATA_PATH, columns=["title"])
             
             # Add poster_path from ingestion data safely
-            if os.path.exists(INGESTION_DATA_PATH):
-                ingestion_df = pd.read_csv(INGESTION_DATA_PATH)
-                if "poster_path" in ingestion_df.columns:
-                    # Use a mapping to ensure row order and count stay identical to embeddings
-                    poster_map = ingestion_df.drop_duplicates('title').set_index('title')['poster_path']
-                    df['poster_path'] = df['title'].map(poster_map)
-                    print("✓ Poster data mapped successfully (alignment preserved)")
+            if resolve_table_path(INGESTION_DATA_PATH) and "poster_path" in table_columns(
+                INGESTION_DATA_PATH
+            ):
+                ingestion_df = read_table(INGESTION_DATA_PATH, columns=["title", "poster_path"])
+                # Use a mapping to ensure row order and count stay identical to embeddings
+                poster_map = ingestion_df.drop_duplicates('title').set_index('title')['poster_path']
+                df['poster_path'] = df['title'].map(poster_map)
+                print("✓ Poster data mapped successfully (alignment preserved)")
             
-            with open(SAVED_EMBEDDING_PATH, "rb") as f:
-                movie_embedding = pickle.load(f)
+            # .npy artifacts are memory-mapped; legacy .pkl ones are unpickled
+            movie_embedding = load_embeddings(SAVED_EMBEDDING_PATH)
+            # Derived artifacts are only used if built from exactly these vectors
+            digest = read_embeddings_digest(SAVED_EMBEDDING_PATH)
+            new_state = ServingState(
+                df,
+                movie_embedding,
+                ann_index=load_ann_index(len(movie_embedding), digest),
+                neighbor_table=load_neighbor_table(len(movie_embedding), digest),
+            )
+            new_state.warm()
             print("✓ Data loaded successfully")
-        else:
-            print("⚠ Artifacts not found. Please train the model first.")
-            df = None
-            movie_embedding = None
+            return new_state
+        print("⚠ Artifacts not found. Please train the model first.")
     except Exception as e:
         print(f"Error loading data: {e}")
-        df = None
-        movie_embedding = None
+    return None
+
+
+def load_data():
+    """(Re)load the artifacts and swap them in with a single reference assignment"""
+    from src.movieRecommendation.utils.tables import resolve_table_path
+
+    global state
+    readiness["status"] = "loading"
+    start = time.perf_counter()
+    state = load_state()
+    readiness["load_seconds"] = round(time.perf_counter() - start, 3)
+    if state is not None:
+        readiness["status"] = "ready"
+    elif resolve_table_path(MOVIE_DATA_PATH) and resolve_embeddings_path(SAVED_EMBEDDING_PATH):
+        readiness["status"] = "failed"
+    else:
+        readiness["status"] = "missing"
 
 
-# Load data on startup
-load_data()
+def find_movie_index(movie_title, state):
+    """Return the row position of a title, or None if it is not in the catalog"""
+    start = time.perf_counter()
+    # 1. Try strict match first (exactly like the research notebook)
+    idx = state.title_index.get(movie_title)
+    if idx is None:
+        # 2. Fallback to case-insensitive search if strict match fails
+        idx = state.title_index_lower.get(movie_title.lower())
+    TITLE_LOOKUP_LATENCY.observe(time.perf_counter() - start)
+    TITLE_LOOKUPS.inc("not_found" if idx is None else "found")
+    return idx
 
 
-def content_based_recommend(movie_title, df, embeddings, N=12):
+def content_based_recommend(movie_title, state, N=12):
     """Generate content-based recommendations"""
+    start = time.perf_counter()
     try:
         # Search for movie index
-        # 1. Try strict match first (exactly like the research notebook)
-        if movie_title in df["title"].values:
-            idx = df[df["title"] == movie_title].index[0]
-        else:
-            # 2. Fallback to case-insensitive search if strict match fails
-            matching_movies = df[df["title"].str.lower() == movie_title.lower()]
-            if matching_movies.empty:
-                return None, f"Movie '{movie_title}' not found in database"
-            idx = matching_movies.index[0]
-        movie_vec = embeddings[idx].reshape(1, -1)
-        sims = cosine_similarity(movie_vec, embeddings).flatten()
-        top_indices = sims.argsort()[::-1][1 : N + 1]
-
-        recommendations = []
-        for i in top_indices:
-            movie_info = {
-                "title": df.iloc[i]["title"],
-                "similarity_score": round(float(sims[i]), 3)
-            }
-            # Add poster_path if it exists in the dataframe
-            if "poster_path" in df.columns:
-                movie_info["poster_path"] = df.iloc[i]["poster_path"]
-            
-            recommendations.append(movie_info)
-            
-        return recommendations, None
+        idx = find_movie_index(movie_title, state)
+        if idx is None:
+            return None, f"Movie '{movie_title}' not found in database"
+        return recommend_for_index(idx, state, N, start), None
     except Exception as e:
         return None, str(e)
 
 
+def recommend_for_index(idx, state, N=12, start=None):
+    """Recommend for an already resolved row, from the cache, table, ANN index or a full scan"""
+    start = time.perf_counter() if start is None else start
+    cached = state.cache.get((idx, N))
+    if cached is not None:
+        RECOMMEND_LATENCY.observe(time.perf_counter() - start, "cache")
+        return cached
+    embeddings = state.embeddings
+    precomputed = None
+    if state.neighbor_table is not None:
+        precomputed = state.neighbor_table.lookup(idx, N)
+    if precomputed is not None:
+        source = "neighbor_table"
+        top_indices, top_scores = precomputed
+    elif state.ann_index is not None:
+        source = "ann"
+        # Approximate search only scores rows in the probed clusters
+        candidates, scores = state.ann_index.search(
+            embeddings, embeddings[idx], N + 1, SERVING_CONFIG["n_probe"]
+        )
+        keep = candidates != idx
+        top_indices, top_scores = candidates[keep][:N], scores[keep][:N]
+    else:
+        source = "exact"
+        # Rows are unit length, so the dot product is the cosine similarity
+        sims = embeddings @ embeddings[idx]
+        top_indices = top_k_indices(sims, N + 1)[1:]
+        top_scores = sims[top_indices]
+
+    recommendations = build_recommendations(
+        state.titles, state.posters, top_indices, top_scores
+    )
+    state.cache.put((idx, N), recommendations)
+    RECOMMEND_LATENCY.observe(time.perf_counter() - start, source)
+    return recommendations
+
+
+def build_recommendations(titles, posters, top_indices, top_scores):
+    """Turn ranked row positions and their scores into response dictionaries"""
+    # Fancy-index the catalog arrays once instead of building a row per result
+    result_titles = titles[top_indices].tolist()
+    result_scores = np.asarray(top_scores).tolist()
+    if posters is None:
+        return [
+            {"title": title, "similarity_score": round(score, 3)}
+            for title, score in zip(result_titles, result_scores)
+        ]
+    # Add poster_path if the catalog has posters
+    return [
+        {"title": title, "similarity_score": round(score, 3), "poster_path": poster}
+        for title, score, poster in zip(
+            result_titles, result_scores, posters[top_indices].tolist()
+        )
+    ]
+
+
+# Number of query rows scored per matrix multiply, bounding the score matrix size
+BATCH_CHUNK_SIZE = 64
+
+
+def batch_content_based_recommend(movie_titles, state, N=12):
+    """Generate recommendations for many titles, returning one result per title"""
+    results = [None] * len(movie_titles)
+    found = []
+    for position, movie_title in enumerate(movie_titles):
+        idx = find_movie_index(movie_title, state)
+        if idx is None:
+            results[position] = {
+                "movie": movie_title,
+                "error": f"Movie '{movie_title}' not found in database",
+                "status": "error",
+            }
+        else:
+            found.append((position, idx))
+
+    neighbors = state.neighbor_table
+    if state.ann_index is not None or (neighbors is not None and N <= neighbors.top_k):
+        # Table lookups and approximate search are per query, so reuse the single-row path
+        for position, idx in found:
+            try:
+                recommendations = recommend_for_index(idx, state, N)
+            except Exception as e:
+                results[position] = {
+                    "movie": movie_titles[position], "error": str(e), "status": "error"
+                }
+            else:
+                results[position] = {
+                    "movie": movie_titles[position],
+                    "recommendations": recommendations,
+                    "status": "success",
+                }
+        return results
+
+    # Serve cached titles directly and only score the rest
+    uncached = []
+    for position, idx in found:
+        cached = state.cache.get((idx, N))
+        if cached is None:
+            uncached.append((position, idx))
+        else:
+            results[position] = {
+                "movie": movie_titles[position], "recommendations": cached, "status": "success"
+            }
+
+    embeddings = state.embeddings
+    for start in range(0, len(uncached), BATCH_CHUNK_SIZE):
+        chunk = uncached[start : start + BATCH_CHUNK_SIZE]
+        # One matrix-matrix product scores every query in the chunk
+        sims = embeddings[[idx for _, idx in chunk]] @ embeddings.T
+        for (position, idx), row in zip(chunk, sims):
+            top_indices = top_k_indices(row, N + 1)[1:]
+            recommendations = build_recommendations(
+                state.titles, state.posters, top_indices, row[top_indices]
+            )
+            state.cache.put((idx, N), recommendations)
+            results[position] = {
+                "movie": movie_titles[position],
+                "recommendations": recommendations,
+                "status": "success",
+            }
+    return results
+
+
 @app.get("/")
 async def index(request: Request):
     """Serve the frontend index page"""
@@ -100,63 +550,226 @@ async def index(request: Request):
 
 
 @app.get("/movies")
-async def get_movies():
+async def get_movies(
+    request: Request,
+    prefix: str | None = None,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+):
     """Get list of all movies in the dataset"""
-    if df is None:
+    current = state
+    if current is None:
         return JSONResponse(
             content={"error": "Data not loaded", "status": "error"},
             status_code=503
         )
-    
-    # Return alphabetical list of titles
-    movie_list = sorted(df["title"].tolist())
-    return JSONResponse(content={"movies": movie_list, "status": "success"})
+
+    catalog = current.catalog
+    if prefix or offset or limit is not None:
+        with MOVIES_SERIALIZATION.time("page"):
+            movie_list, total = catalog.page(prefix, offset, limit)
+            response = JSONResponse(
+                content={
+                    "movies": movie_list,
+                    "total": total,
+                    "offset": offset,
+                    "limit": limit,
+                    "status": "success",
+                }
+            )
+        return response
+
+    # Full alphabetical list: serve the bytes serialized at load time
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {
+        "ETag": catalog.gzip_etag if use_gzip else catalog.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    # Either coding carries the same titles, so both validate the client's copy
+    client_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if client_tags & {catalog.etag, catalog.gzip_etag}:
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(catalog.gzip_body, media_type="application/json", headers=headers)
+    return Response(catalog.json_body, media_type="application/json", headers=headers)
 
 
 @app.get("/health")
 async def health_check():
-    """Check if the service is ready"""
+    """Readiness: 200 once artifacts are loaded and warmed, 503 until then"""
+    current = state
     status = {
-        "status": "healthy",
-        "model_loaded": df is not None and movie_embedding is not None,
+        "status": "ready" if current is not None else readiness["status"],
+        "model_loaded": current is not None,
+        "load_seconds": readiness["load_seconds"],
         "data_path_exists": os.path.exists(MOVIE_DATA_PATH),
-        "embeddings_path_exists": os.path.exists(SAVED_EMBEDDING_PATH),
+        "embeddings_path_exists": resolve_embeddings_path(SAVED_EMBEDDING_PATH) is not None,
+        "recommendation_cache": current.cache.stats() if current is not None else None,
     }
-    return JSONResponse(content=status)
+    return JSONResponse(content=status, status_code=200 if current is not None else 503)
 
 
-@app.get("/train")
-async def training():
-    """Train the model"""
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness: the process is up and serving, whether or not artifacts are loaded"""
+    return JSONResponse(content={"status": "alive"})
+
+
+@app.get("/metrics")
+async def metrics():
+    """Expose request, recommendation, cache and memory metrics for Prometheus"""
+    return Response(METRICS.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/search")
+async def search_titles(q: str, limit: int = Query(10, ge=1, le=100)):
+    """Autocomplete titles by prefix, falling back to typo-tolerant matches"""
+    current = state
+    if current is None:
+        return JSONResponse(
+            content={"error": "Data not loaded", "status": "error"},
+            status_code=503
+        )
+    results = current.search_index.search(q, limit=limit)
+    return JSONResponse(content={"query": q, "results": results, "status": "success"})
+
+
+TRAINING_COMMAND = [sys.executable, "main.py"]
+# main.py logs ">>>>>> Stage <name> started|completed|skipped <<<<<<" for every stage
+STAGE_LOG_PATTERN = re.compile(r">>>>>> Stage (.+) (started|completed|skipped) <<<<<<")
+
+
+class TrainingJob:
+    """A background run of the training pipeline and its progress"""
+
+    def __init__(self):
+        self.job_id = uuid.uuid4().hex
+        self.status = "running"
+        self.message = "Training started"
+        self.current_stage = None
+        self.completed_stages = []
+        # Stages main.py reused because their inputs were unchanged
+        self.skipped_stages = []
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "message": self.message,
+            "current_stage": self.current_stage,
+            "completed_stages": list(self.completed_stages),
+            "skipped_stages": list(self.skipped_stages),
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+training_jobs = {}
+active_training_job = None
+training_lock = threading.Lock()
+
+
+def run_training_job(job):
+    """Run the pipeline in a subprocess, then hot-swap the new artifacts in"""
+    global state
     try:
-        os.system("python main.py")
-        # Reload data after training
-        load_data()
+        process = subprocess.Popen(
+            TRAINING_COMMAND, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+        )
+        last_lines = deque(maxlen=20)
+        for line in process.stdout:
+            last_lines.append(line.rstrip())
+            match = STAGE_LOG_PATTERN.search(line)
+            if match is None:
+                continue
+            stage, event = match.groups()
+            if event == "started":
+                job.current_stage = stage
+            elif event == "skipped":
+                job.skipped_stages.append(stage)
+            else:
+                job.completed_stages.append(stage)
+                job.current_stage = None
+        returncode = process.wait()
 
-        if df is not None and movie_embedding is not None:
-            return JSONResponse(
-                content={"message": "Training successful!", "status": "success"}
-            )
-        else:
+        if returncode != 0:
+            job.status = "failed"
+            job.message = f"Training exited with code {returncode}: " + "\n".join(last_lines)
+            return
+
+        # Load outside the swap so requests keep using the old artifacts meanwhile
+        new_state = load_state()
+        if new_state is None:
+            job.status = "failed"
+            job.message = "Training completed but data could not be loaded"
+            return
+        state = new_state
+        readiness["status"] = "ready"
+        job.status = "succeeded"
+        job.message = "Training successful!"
+    except Exception as e:
+        job.status = "failed"
+        job.message = f"Error occurred: {e}"
+    finally:
+        job.finished_at = time.time()
+
+
+@app.get("/train")
+async def training():
+    """Start training the model in the background"""
+    global active_training_job
+    if SERVING_CONFIG["workers"] > 1:
+        # A finished job would only swap the artifacts of the worker that ran it
+        return JSONResponse(
+            content={
+                "message": "Training is disabled with several workers. "
+                "Run `python main.py` and restart the server instead.",
+                "status": "error",
+            },
+            status_code=409,
+        )
+    with training_lock:
+        if active_training_job is not None and active_training_job.status == "running":
             return JSONResponse(
                 content={
-                    "message": "Training completed but data could not be loaded",
-                    "status": "warning",
+                    "message": "A training job is already running",
+                    "job_id": active_training_job.job_id,
+                    "status": "error",
                 },
-                status_code=500,
+                status_code=409,
             )
-    except Exception as e:
+        job = TrainingJob()
+        training_jobs[job.job_id] = job
+        active_training_job = job
+
+    threading.Thread(target=run_training_job, args=(job,), daemon=True).start()
+    return JSONResponse(content=job.to_dict(), status_code=202)
+
+
+@app.get("/train/{job_id}")
+async def training_status(job_id: str):
+    """Get the status and stage progress of a training job"""
+    job = training_jobs.get(job_id)
+    if job is None:
         return JSONResponse(
-            content={"message": f"Error occurred: {e}", "status": "error"},
-            status_code=500,
+            content={"error": f"Training job '{job_id}' not found", "status": "error"},
+            status_code=404,
         )
+    return JSONResponse(content=job.to_dict())
 
 
 @app.post("/recommend")
-async def predict(movie_title: str, n_recommendations: int = 12):
+async def predict(movie_title: str, n_recommendations: int = Query(12, ge=0)):
     """Get movie recommendations"""
+    # Take one reference so a concurrent swap cannot mix artifacts mid-request
+    current = state
     # Check if data is loaded
-    if df is None or movie_embedding is None:
+    if current is None:
         return JSONResponse(
             content={
                 "error": "Model not loaded. Please train the model first using /train endpoint",
@@ -168,14 +781,18 @@ async def predict(movie_title: str, n_recommendations: int = 12):
     try:
         recommendations, error = content_based_recommend(
             movie_title=movie_title,
-            df=df,
-            embeddings=movie_embedding,
+            state=current,
             N=n_recommendations,
         )
 
         if error:
+            # Suggest close titles for typos instead of a bare 404
+            suggestions = [
+                result["title"] for result in current.search_index.search(movie_title, limit=5)
+            ]
             return JSONResponse(
-                content={"error": error, "status": "error"}, status_code=404
+                content={"error": error, "suggestions": suggestions, "status": "error"},
+                status_code=404,
             )
 
         return JSONResponse(
@@ -192,5 +809,84 @@ async def predict(movie_title: str, n_recommendations: int = 12):
         )
 
 
+class BatchRecommendRequest(BaseModel):
+    movie_titles: list[str]
+    n_recommendations: int = Field(12, ge=0)
+
+
+@app.post("/recommend/batch")
+async def predict_batch(request: BatchRecommendRequest):
+    """Get movie recommendations for many titles in one call"""
+    current = state
+    if current is None:
+        return JSONResponse(
+            content={
+                "error": "Model not loaded. Please train the model first using /train endpoint",
+                "status": "error",
+            },
+            status_code=503,
+        )
+
+    try:
+        results = batch_content_based_recommend(
+            movie_titles=request.movie_titles,
+            state=current,
+            N=request.n_recommendations,
+        )
+        return JSONResponse(content={"results": results, "status": "success"})
+    except Exception as e:
+        return JSONResponse(
+            content={"error": f"Error occurred: {e}", "status": "error"},
+            status_code=500,
+        )
+
+
+def serve(host="0.0.0.0", port=8000, workers=None):
+    """Run the server, pre-forking workers that share one loaded copy of the artifacts.
+
+    With a single worker this is a plain uvicorn run. With more, the parent
+    loads and warms the artifacts once, binds the socket and then forks the
+    workers: the memory-mapped embeddings are shared through the page cache
+    and the title arrays and lookup tables copy-on-write, so memory stays
+    roughly flat as workers are added. Platforms without fork run one worker.
+    """
+    workers = workers or SERVING_CONFIG["workers"]
+    if workers <= 1 or not hasattr(os, "fork"):
+        uvicorn.run(app, host=host, port=port)
+        return
+
+    load_data()
+    # Keep the collector from writing to (and so copying) the shared objects
+    gc.freeze()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            # Artifacts are already loaded, so the workers skip the lifespan hook
+            config = uvicorn.Config(app, lifespan="off")
+            uvicorn.Server(config).run(sockets=[sock])
+            os._exit(0)
+        children.append(pid)
+    print(f"✓ Serving on http://{host}:{port} with {workers} workers")
+
+    def stop_workers(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+    for pid in children:
+        os.waitpid(pid, 0)
+    sock.close()
+
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    serve()
@@ -0,0 +1,82 @@
+"""Compare the row-wise and vectorized DataTransformation steps on a synthetic frame.
+
+Usage:
+    python -m benchmarks.bench_data_transformation --rows 1000000
+"""
+import argparse
+import time
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+from src.movieRecommendation.components.data_transformation import DataTransformation
+
+GENRES = ["Action", "Comedy", "Drama", "Science Fiction", "Horror", "Romance", "Thriller"]
+COMPANIES = ["Warner Bros. Pictures", "Universal Pictures", "Paramount", "Studio Ghibli"]
+
+
+def make_frame(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    genre_lists = [
+        str(rng.choice(GENRES, size=rng.integers(1, 4), replace=False).tolist())
+        for _ in range(n_rows)
+    ]
+    companies = [
+        ", ".join(rng.choice(COMPANIES, size=rng.integers(1, 3), replace=False))
+        for _ in range(n_rows)
+    ]
+    return pd.DataFrame(
+        {
+            "genres": genre_lists,
+            "production_companies": companies,
+            "concat_description": ["A heist goes wrong in the city"] * n_rows,
+        }
+    )
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.2f} s")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    transformer = DataTransformation(MagicMock())
+    df = make_frame(args.rows)
+    print(f"Synthetic frame: {len(df)} rows")
+
+    old, old_time = timed("clean_genres (apply)", lambda: df["genres"].apply(transformer.clean_genres))
+    new, new_time = timed("clean_genres_column", lambda: transformer.clean_genres_column(df["genres"]))
+    assert old.tolist() == new.tolist()
+    print(f"{'speedup':<40} {old_time / new_time:8.1f} x\n")
+    df["genres"] = new
+
+    old, old_time = timed(
+        "production_companies (apply)",
+        lambda: df["production_companies"].apply(
+            lambda x: ", ".join([c.replace(" ", "") for c in x.split(",")])
+        ),
+    )
+    new, new_time = timed(
+        "clean_production_companies",
+        lambda: transformer.clean_production_companies(df["production_companies"]),
+    )
+    assert old.tolist() == new.tolist()
+    print(f"{'speedup':<40} {old_time / new_time:8.1f} x\n")
+
+    old, old_time = timed(
+        "weight_description (apply axis=1)",
+        lambda: df.apply(transformer.weight_description, axis=1),
+    )
+    new, new_time = timed("weight_descriptions", lambda: transformer.weight_descriptions(df))
+    assert old.tolist() == new.tolist()
+    print(f"{'speedup':<40} {old_time / new_time:8.1f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Time every pipeline stage offline on synthetic data at several sizes.
+
+For each size a synthetic final-movie-data.zip is generated and run through
+ingestion, transformation, preparation, model training, the ANN index and the
+neighbor table in a temporary directory, using the settings in params.yaml.
+The HuggingFace model is replaced by a hashing embedder so nothing is
+downloaded. Stage and step timings come from RunProfiler, the same
+instrumentation main.py uses, and are collected into one JSON file so runs can
+be compared across commits.
+
+Usage:
+    python -m benchmarks.bench_pipeline --sizes 1000 10000 100000
+    python -m benchmarks.bench_pipeline --sizes 50000 --streaming --skip neighbor_table
+"""
+import os
+import json
+import time
+import zlib
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+from src.movieRecommendation.constants import PARAMS_FILE_PATH
+from src.movieRecommendation.utils.common import read_yaml
+from src.movieRecommendation.utils.profiling import RunProfiler
+from src.movieRecommendation.entity import (
+    DataIngestionConfig,
+    DataTransformationConfig,
+    DataPreparationConfig,
+    ModelTrainerConfig,
+    ANNIndexConfig,
+    NeighborTableConfig,
+)
+from src.movieRecommendation.components.data_ingestion import DataIngestion
+from src.movieRecommendation.components.data_transformation import DataTransformation
+from src.movieRecommendation.components.data_preparation import DataPreparation
+from src.movieRecommendation.components.model_trainer import ModelTrainer
+from src.movieRecommendation.components.ann_index import ANNIndexBuilder
+from src.movieRecommendation.components.neighbor_table import NeighborTableBuilder
+from src.movieRecommendation.utils.tables import read_table, write_table
+from benchmarks.synthetic_data import make_final_frame, write_final
+
+STAGES = [
+    "data_ingestion",
+    "data_transformation",
+    "data_preparation",
+    "model_trainer",
+    "ann_index",
+    "neighbor_table",
+]
+
+
+class HashingEmbedder:
+    """Offline stand-in for HuggingFaceEmbeddings: a normalized bag of hashed tokens"""
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def embed_documents(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.split():
+                vectors[row, zlib.crc32(token.encode("utf-8")) % self.dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).tolist()
+
+
+def nltk_data_available():
+    import nltk
+
+    try:
+        for resource in ("corpora/stopwords", "corpora/wordnet", "tokenizers/punkt_tab"):
+            nltk.data.find(resource)
+    except LookupError:
+        return False
+    return True
+
+
+def make_configs(root, params, streaming, dim):
+    def stage_dir(name):
+        path = os.path.join(root, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    stream_chunk_size = params.streaming.chunk_size
+    ingestion_dir = stage_dir("data_ingestion")
+    embeddings_path = os.path.join(stage_dir("model_trainer"), "movie_embeddings.npy")
+    return {
+        "data_ingestion": DataIngestionConfig(
+            root_dir=ingestion_dir,
+            drive_file_id="",
+            local_data_file=os.path.join(ingestion_dir, "final-movie-data.zip"),
+            unzip_dir=ingestion_dir,
+            streaming=streaming,
+            stream_chunk_size=stream_chunk_size,
+        ),
+        "data_transformation": DataTransformationConfig(
+            root_dir=stage_dir("data_transformation"),
+            data_path=ingestion_dir,
+            streaming=streaming,
+            stream_chunk_size=stream_chunk_size,
+        ),
+        "data_preparation": DataPreparationConfig(
+            root_dir=stage_dir("data_preparation"),
+            data_path=os.path.join(root, "data_transformation"),
+            n_workers=params.data_preparation.n_workers,
+            chunk_size=params.data_preparation.chunk_size,
+            streaming=streaming,
+            stream_chunk_size=stream_chunk_size,
+        ),
+        "model_trainer": ModelTrainerConfig(
+            root_dir=os.path.join(root, "model_trainer"),
+            data_path=os.path.join(root, "data_preparation"),
+            model_name=f"hashing-embedder-{dim}",
+            model_path=os.path.join(root, "model_trainer"),
+            embedding_store_dir=os.path.join(root, "model_trainer", "embedding_store"),
+            checkpoint_dir=os.path.join(root, "model_trainer", "checkpoint"),
+            batch_size=params.model_trainer.batch_size,
+            checkpoint_every=params.model_trainer.checkpoint_every,
+        ),
+        "ann_index": ANNIndexConfig(
+            root_dir=stage_dir("ann_index"),
+            embeddings_path=embeddings_path,
+            **params.ann_index,
+        ),
+        "neighbor_table": NeighborTableConfig(
+            root_dir=stage_dir("neighbor_table"),
+            embeddings_path=embeddings_path,
+            **params.neighbor_table,
+        ),
+    }
+
+
+def stand_in_preparation(config):
+    """Writes prepared.parquet without NLTK so the later stages can still be timed"""
+    df = read_table(os.path.join(config.data_path, "transformed.parquet"))
+    df["cleaned_description"] = df.pop("concat_description").str.lower()
+    write_table(df, os.path.join(config.root_dir, "prepared.parquet"))
+
+
+def run_size(n_rows, args, params, report_dir):
+    with tempfile.TemporaryDirectory() as root:
+        configs = make_configs(root, params, args.streaming, args.dim)
+        start = time.perf_counter()
+        write_final(
+            make_final_frame(n_rows, seed=args.seed), configs["data_ingestion"].local_data_file
+        )
+        print(f"\n{n_rows} rows (generated in {time.perf_counter() - start:.1f} s)")
+
+        has_nltk = nltk_data_available()
+        trainer = ModelTrainer(configs["model_trainer"])
+        trainer.load_hf_embedding = lambda: HashingEmbedder(args.dim)
+
+        def ingest():
+            ingestion = DataIngestion(configs["data_ingestion"])
+            if args.streaming:
+                ingestion.stream_to_parquet()
+            else:
+                ingestion.extract_zip_file()
+                ingestion.convert_to_parquet()
+
+        runners = {
+            "data_ingestion": ingest,
+            "data_transformation": DataTransformation(configs["data_transformation"]).transform,
+            "data_preparation": DataPreparation(configs["data_preparation"]).prepare,
+            "model_trainer": trainer.train,
+            "ann_index": ANNIndexBuilder(configs["ann_index"]).build,
+            "neighbor_table": NeighborTableBuilder(configs["neighbor_table"]).build,
+        }
+
+        profiler = RunProfiler(os.path.join(report_dir, f"rows-{n_rows}"), profile=args.profile)
+        for key in STAGES:
+            if key in args.skip:
+                profiler.skip(key, key)
+                continue
+            if key == "data_preparation" and not has_nltk:
+                # Not timed: NLTK corpora are missing, so a lowercase stand-in feeds later stages
+                stand_in_preparation(configs["data_preparation"])
+                profiler.skip(key, key)
+                print(f"  {key:<22} skipped (NLTK data not installed)")
+                continue
+            with profiler.stage(key, key) as record:
+                runners[key]()
+            print(
+                f"  {key:<22} {record['wall_seconds']:8.2f} s wall "
+                f"{record['cpu_seconds'] + record['child_cpu_seconds']:8.2f} s CPU"
+            )
+        return profiler.report
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 50_000])
+    parser.add_argument("--dim", type=int, default=384, help="Stub embedding dimension")
+    parser.add_argument("--streaming", action="store_true", help="Use the chunked streaming mode")
+    parser.add_argument("--skip", nargs="+", choices=STAGES, default=[], metavar="STAGE")
+    parser.add_argument("--profile", action="store_true", help="Dump a cProfile file per stage")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--output-dir",
+        default=os.path.join("benchmarks", "results", f"pipeline-{time.strftime('%Y%m%d-%H%M%S')}"),
+    )
+    args = parser.parse_args()
+
+    params = read_yaml(PARAMS_FILE_PATH)
+    results = {
+        "commit": git_commit(),
+        "created_at": time.time(),
+        "params": vars(args),
+        "sizes": {str(n_rows): run_size(n_rows, args, params, args.output_dir) for n_rows in args.sizes},
+    }
+    summary_path = os.path.join(args.output_dir, "summary.json")
+    with open(summary_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved results to {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Check how /recommend throughput and memory scale with the number of workers.
+
+Fabricates the same synthetic artifacts as bench_serving, then for each worker
+count starts app.serve in a child process, waits for /health to report ready
+and drives uncached /recommend calls over HTTP. Alongside throughput and
+latency it reports the server's memory summed over the parent and its workers:
+RSS counts shared pages once per process, while PSS splits them between the
+processes sharing them, so a flat PSS total means the artifacts are shared.
+
+Usage:
+    python -m benchmarks.bench_scaling --rows 100000 --max-workers 8
+    python -m benchmarks.bench_scaling --workers 1 2 4 --concurrency 32
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import multiprocessing
+import numpy as np
+import httpx
+from benchmarks.bench_serving import build_scenarios, drive, free_port, git_commit, make_artifacts
+
+
+def process_tree(pid):
+    """Returns pid followed by the pids of its direct children (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [pid] + [int(child) for child in f.read().split()]
+    except OSError:
+        return [pid]
+
+
+def tree_memory_mb(pid):
+    """Sums RSS and PSS in MiB over a process and its children, or None off Linux"""
+    totals = {"rss_mb": 0.0, "pss_mb": 0.0}
+    for member in process_tree(pid):
+        try:
+            with open(f"/proc/{member}/smaps_rollup") as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    if key in ("Rss", "Pss"):
+                        totals[f"{key.lower()}_mb"] += int(rest.split()[0]) / 1024
+        except OSError:
+            return None
+    return {key: round(value, 1) for key, value in totals.items()}
+
+
+def run_server(root, embeddings_path, port, workers):
+    import app
+
+    app.MOVIE_DATA_PATH = os.path.join(root, "prepared.parquet")
+    app.INGESTION_DATA_PATH = os.path.join(root, "final.parquet")
+    app.SAVED_EMBEDDING_PATH = embeddings_path
+    # Uncached exact scoring, so every request does the same CPU work
+    app.SERVING_CONFIG.update(
+        search_mode="exact", neighbor_table_dir=os.path.join(root, "neighbor_table"), cache_size=0
+    )
+    logging.getLogger("uvicorn.access").disabled = True
+    app.serve(host="127.0.0.1", port=port, workers=workers)
+
+
+async def wait_until_ready(client, timeout=300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not become ready")
+
+
+async def measure(port, make_request, args):
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120
+    ) as client:
+        await wait_until_ready(client)
+        await drive(client, make_request, args.concurrency * 4, args.concurrency)
+        return await drive(client, make_request, args.requests, args.concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--workers", type=int, nargs="+", help="Worker counts (default 1..max)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--output",
+        default=os.path.join("benchmarks", "results", f"scaling-{time.strftime('%Y%m%d-%H%M%S')}.json"),
+    )
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    worker_counts = args.workers or list(range(1, args.max_workers + 1))
+    context = multiprocessing.get_context("fork")
+
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        print(f"Fabricating {args.rows} rows x {args.dim} dims...")
+        titles, embeddings_path, _ = make_artifacts(root, args.rows, args.dim, args.seed, "exact")
+        for workers in worker_counts:
+            port = free_port()
+            server = context.Process(
+                target=run_server, args=(root, embeddings_path, port, workers), daemon=False
+            )
+            server.start()
+            try:
+                scenarios = build_scenarios(titles, np.random.default_rng(args.seed), 1)
+                summary = asyncio.run(measure(port, scenarios["recommend"], args))
+                summary.update(workers=workers, memory=tree_memory_mb(server.pid))
+            finally:
+                server.terminate()
+                server.join()
+            results.append(summary)
+            speedup = summary["throughput_rps"] / results[0]["throughput_rps"]
+            memory = summary["memory"] or {}
+            print(
+                f"  {workers:>2} workers  {summary['throughput_rps']:8.1f} req/s  x{speedup:4.2f}  "
+                f"p50 {summary['p50_ms']:8.2f} ms  p99 {summary['p99_ms']:8.2f} ms  "
+                f"RSS {memory.get('rss_mb')} MiB  PSS {memory.get('pss_mb')} MiB"
+            )
+
+    report = {
+        "commit": git_commit(),
+        "created_at": time.time(),
+        "cpu_count": os.cpu_count(),
+        "params": vars(args),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
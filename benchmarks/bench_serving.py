@@ -0,0 +1,284 @@
+"""Measure app.py startup, latency and throughput on synthetic artifacts.
+
+Fabricates titles, posters and unit-length embeddings at the requested scale,
+loads them through app.load_state, then drives the endpoints with concurrent
+clients in-process (ASGI) and/or over local HTTP (uvicorn). Reports p50/p95/p99
+latency, throughput and RSS per endpoint and saves everything as JSON so runs
+can be compared across commits.
+
+Usage:
+    python -m benchmarks.bench_serving --rows 100000 --concurrency 16
+    python -m benchmarks.bench_serving --rows 5000000 --dim 128 --mode http
+"""
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+import numpy as np
+import pandas as pd
+import httpx
+import uvicorn
+from src.movieRecommendation.utils.profiling import peak_rss_mb
+from src.movieRecommendation.utils.embeddings import read_embeddings_digest, write_embeddings_digest
+
+ADJECTIVES = ["Dark", "Silent", "Lost", "Golden", "Broken", "Last", "Hidden", "Crimson"]
+NOUNS = ["Knight", "River", "Empire", "Garden", "Signal", "Horizon", "Harbor", "Mirror"]
+EMBEDDING_BLOCK_ROWS = 100_000
+
+
+def current_rss_mb():
+    """Returns the current resident set size in MiB, or None off Linux"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+
+
+def make_titles(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    adjectives = np.array(ADJECTIVES)[rng.integers(0, len(ADJECTIVES), n_rows)]
+    nouns = np.array(NOUNS)[rng.integers(0, len(NOUNS), n_rows)]
+    return [f"The {a} {n} {i}" for i, (a, n) in enumerate(zip(adjectives, nouns))]
+
+
+def make_artifacts(root, n_rows, dim, seed, search_mode):
+    """Writes prepared.parquet, final.parquet and embeddings under root"""
+    titles = make_titles(n_rows, seed)
+    pd.DataFrame({"title": titles}).to_parquet(os.path.join(root, "prepared.parquet"), index=False)
+    posters = [f"/poster_{i}.jpg" if i % 10 else None for i in range(n_rows)]
+    pd.DataFrame({"title": titles, "poster_path": posters}).to_parquet(
+        os.path.join(root, "final.parquet"), index=False
+    )
+
+    # Written block by block so 5M x dim never needs a second full copy in RAM
+    rng = np.random.default_rng(seed)
+    embeddings_path = os.path.join(root, "movie_embeddings.npy")
+    embeddings = np.lib.format.open_memmap(
+        embeddings_path, mode="w+", dtype=np.float32, shape=(n_rows, dim)
+    )
+    for start in range(0, n_rows, EMBEDDING_BLOCK_ROWS):
+        block = rng.standard_normal((min(EMBEDDING_BLOCK_ROWS, n_rows - start), dim), dtype=np.float32)
+        embeddings[start : start + len(block)] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    embeddings.flush()
+    # The app only trusts an ANN index built from embeddings with this digest
+    write_embeddings_digest(embeddings, embeddings_path)
+
+    ann_index_path = os.path.join(root, "ivf_flat.npz")
+    if search_mode == "approximate":
+        from src.movieRecommendation.components.ann_index import IVFFlatIndex
+
+        index = IVFFlatIndex.build(np.load(embeddings_path, mmap_mode="r"))
+        index.source_digest = read_embeddings_digest(embeddings_path)
+        index.save(ann_index_path)
+    return titles, embeddings_path, ann_index_path
+
+
+def percentile_summary(latencies, errors, elapsed):
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else None,
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "max_ms": round(float(latencies_ms.max()), 3),
+    }
+
+
+def build_scenarios(titles, rng, batch_size):
+    """Returns endpoint name -> function returning the next (method, url, kwargs) to send"""
+    def pick():
+        return titles[rng.integers(0, len(titles))]
+
+    def misspell():
+        # Swapping two neighbouring characters defeats the prefix match, like a typo
+        title = pick()
+        i = rng.integers(1, len(title) - 1)
+        return title[: i - 1] + title[i] + title[i - 1] + title[i + 1 :]
+
+    return {
+        "recommend": lambda: ("POST", "/recommend", {"params": {"movie_title": pick()}}),
+        "recommend_batch": lambda: (
+            "POST",
+            "/recommend/batch",
+            {"json": {"movie_titles": [pick() for _ in range(batch_size)]}},
+        ),
+        "search": lambda: ("GET", "/search", {"params": {"q": pick()[:10]}}),
+        "search_fuzzy": lambda: ("GET", "/search", {"params": {"q": misspell()}}),
+        "movies_page": lambda: (
+            "GET",
+            "/movies",
+            {"params": {"prefix": pick()[:8], "limit": 50}},
+        ),
+        "movies_full": lambda: ("GET", "/movies", {"headers": {"Accept-Encoding": "gzip"}}),
+        "health": lambda: ("GET", "/health", {}),
+    }
+
+
+async def drive(client, make_request, n_requests, concurrency):
+    """Sends n_requests from concurrency workers and summarizes their latencies"""
+    latencies = []
+    errors = 0
+    remaining = iter(range(n_requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            method, url, kwargs = make_request()
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return percentile_summary(latencies, errors, time.perf_counter() - start)
+
+
+async def run_scenarios(client, scenarios, args):
+    results = {}
+    for name, make_request in scenarios.items():
+        n_requests = args.requests if name != "movies_full" else max(1, args.requests // 20)
+        # Warm up caches and lazy paths before measuring
+        await drive(client, make_request, min(20, n_requests), 1)
+        results[name] = await drive(client, make_request, n_requests, args.concurrency)
+        results[name]["rss_mb"] = current_rss_mb()
+        print(
+            f"  {name:<16} p50 {results[name]['p50_ms']:8.2f} ms  "
+            f"p95 {results[name]['p95_ms']:8.2f} ms  p99 {results[name]['p99_ms']:8.2f} ms  "
+            f"{results[name]['throughput_rps']:8.1f} req/s"
+        )
+    return results
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_http(app_module, scenarios, args):
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app_module.app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"
+        )
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120
+        ) as client:
+            return await run_scenarios(client, scenarios, args)
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+async def run_in_process(app_module, scenarios, args):
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        return await run_scenarios(client, scenarios, args)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=16, help="Titles per /recommend/batch call")
+    parser.add_argument("--mode", choices=["inprocess", "http", "both"], default="both")
+    parser.add_argument("--search-mode", choices=["exact", "approximate"], default="exact")
+    parser.add_argument("--cache-size", type=int, default=0, help="0 measures uncached scoring")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--output",
+        default=os.path.join("benchmarks", "results", f"serving-{time.strftime('%Y%m%d-%H%M%S')}.json"),
+    )
+    args = parser.parse_args()
+    # The project logger runs at INFO; per-request client logs would skew latencies
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    start = time.perf_counter()
+    import app as app_module
+
+    import_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as root:
+        print(f"Fabricating {args.rows} rows x {args.dim} dims...")
+        titles, embeddings_path, ann_index_path = make_artifacts(
+            root, args.rows, args.dim, args.seed, args.search_mode
+        )
+        app_module.MOVIE_DATA_PATH = os.path.join(root, "prepared.parquet")
+        app_module.INGESTION_DATA_PATH = os.path.join(root, "final.parquet")
+        app_module.SAVED_EMBEDDING_PATH = embeddings_path
+        app_module.SERVING_CONFIG.update(
+            search_mode=args.search_mode,
+            ann_index_path=ann_index_path,
+            neighbor_table_dir=os.path.join(root, "neighbor_table"),
+            cache_size=args.cache_size,
+        )
+
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        app_module.state = app_module.load_state()
+        load_seconds = time.perf_counter() - start
+        if app_module.state is None:
+            sys.exit("app.load_state() could not load the synthetic artifacts")
+        startup = {
+            "import_seconds": round(import_seconds, 3),
+            "load_state_seconds": round(load_seconds, 3),
+            "rss_before_load_mb": rss_before,
+            "rss_after_load_mb": current_rss_mb(),
+        }
+        print(f"Startup: import {import_seconds:.2f} s, load_state {load_seconds:.2f} s")
+
+        results = {}
+        modes = ["inprocess", "http"] if args.mode == "both" else [args.mode]
+        for mode in modes:
+            print(f"{mode} ({args.concurrency} concurrent clients):")
+            scenarios = build_scenarios(titles, np.random.default_rng(args.seed), args.batch_size)
+            runner = run_in_process if mode == "inprocess" else run_http
+            results[mode] = asyncio.run(runner(app_module, scenarios, args))
+
+    report = {
+        "commit": git_commit(),
+        "created_at": time.time(),
+        "params": vars(args),
+        "startup": startup,
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Generate a synthetic final.csv shaped like the real movie dataset.
+
+Every column the pipeline reads or drops is present. genres is a Python list
+literal, keywords and production_companies are comma-separated, and overviews
+are sentences drawn from a fixed pseudo-English vocabulary, so the
+preprocessing code does realistic work without downloading the dataset.
+
+Usage:
+    python -m benchmarks.synthetic_data --rows 100000 --output /tmp/final.csv
+    python -m benchmarks.synthetic_data --rows 100000 --output /tmp/final-movie-data.zip
+"""
+import os
+import zipfile
+import argparse
+import numpy as np
+import pandas as pd
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary", "Drama",
+    "Family", "Fantasy", "History", "Horror", "Music", "Mystery", "Romance",
+    "Science Fiction", "TV Movie", "Thriller", "War", "Western",
+]
+COMPANIES = [
+    "Warner Bros. Pictures", "Universal Pictures", "Paramount", "Columbia Pictures",
+    "20th Century Fox", "Walt Disney Pictures", "Studio Ghibli", "Legendary Pictures",
+    "Lionsgate", "A24", "New Line Cinema", "DreamWorks Pictures", "Toho", "Gaumont",
+]
+LANGUAGES = ["en", "en", "en", "fr", "es", "ja", "ko", "de", "it", "hi"]
+SYLLABLES = ["ka", "lo", "mi", "ren", "tor", "ash", "vel", "dun", "qui", "sa", "bri", "el", "on"]
+COMMON_WORDS = [
+    "the", "a", "of", "and", "to", "in", "his", "her", "their", "is", "who", "after",
+    "when", "must", "finds", "young", "world", "life", "family", "love", "war", "city",
+    "running", "stories", "friends", "secrets", "years", "discovers", "against", "2nd",
+]
+
+
+def make_vocabulary(size, rng):
+    """Returns size pseudo-words plus common English words, inflections and numbers"""
+    lengths = rng.integers(2, 5, size)
+    words = [
+        "".join(rng.choice(SYLLABLES, length)) + rng.choice(["", "s", "ing", "ed"])
+        for length in lengths
+    ]
+    return np.array(COMMON_WORDS * 20 + words)
+
+
+def make_final_frame(n_rows, seed=42, vocabulary_size=5000):
+    """Returns a dataframe with the columns and value shapes of final.csv"""
+    rng = np.random.default_rng(seed)
+    vocabulary = make_vocabulary(vocabulary_size, rng)
+
+    def phrases(min_words, max_words):
+        counts = rng.integers(min_words, max_words, n_rows)
+        words = vocabulary[rng.integers(0, len(vocabulary), counts.sum())]
+        return [" ".join(row) for row in np.split(words, np.cumsum(counts)[:-1])]
+
+    def picks(choices, low, high, fmt):
+        return [
+            fmt(rng.choice(choices, rng.integers(low, high), replace=False).tolist())
+            for _ in range(n_rows)
+        ]
+
+    keyword_counts = rng.integers(3, 11, n_rows)
+    keyword_words = vocabulary[rng.integers(0, len(vocabulary), keyword_counts.sum())]
+    keywords = [", ".join(row) for row in np.split(keyword_words, np.cumsum(keyword_counts)[:-1])]
+    ids = np.arange(1, n_rows + 1)
+    return pd.DataFrame(
+        {
+            "title": [f"{title.title()} {i}" for i, title in enumerate(phrases(1, 4))],
+            "id": ids,
+            "original_language": rng.choice(LANGUAGES, n_rows),
+            "overview": [text.capitalize() + "." for text in phrases(20, 80)],
+            "genres": picks(GENRES, 1, 4, str),
+            "production_companies": picks(COMPANIES, 1, 4, ", ".join),
+            "keywords": keywords,
+            "positive_users": ["[]"] * n_rows,
+            "positive_count": rng.integers(0, 500, n_rows),
+            "negative_users": ["[]"] * n_rows,
+            "negative_count": rng.integers(0, 100, n_rows),
+            "vote_average": np.round(rng.uniform(1, 10, n_rows), 1),
+            "vote_count": rng.integers(0, 20000, n_rows),
+            "status": "Released",
+            "release_date": pd.to_datetime(rng.integers(0, 18000, n_rows), unit="D").strftime("%Y-%m-%d"),
+            "revenue": rng.integers(0, 10**9, n_rows),
+            "runtime": rng.integers(60, 200, n_rows),
+            "budget": rng.integers(0, 2 * 10**8, n_rows),
+            "poster_path": [f"/{i:08x}.jpg" for i in ids],
+            "movieId": ids,
+            "imdbId": ids + 100000,
+            "tmdb_id": ids,
+            "imdb_id": [f"tt{i + 100000:07d}" for i in ids],
+            "adult": False,
+            "tmdbId": ids,
+        }
+    )
+
+
+def write_final(df, output):
+    """Writes df as final.csv, or as a zip holding final.csv if output ends in .zip"""
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    if output.endswith(".zip"):
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+            zip_ref.writestr("final.csv", df.to_csv(index=False))
+    else:
+        df.to_csv(output, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="final.csv")
+    args = parser.parse_args()
+    write_final(make_final_frame(args.rows, args.seed), args.output)
+    print(f"Wrote {args.rows} synthetic movies to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
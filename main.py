@@ -1,4 +1,21 @@
+import os
+import inspect
+import argparse
+from dataclasses import dataclass
+from typing import Callable
 from src.movieRecommendation.logging import logger
+from src.movieRecommendation.config.configuration import ConfigurationManager
+from src.movieRecommendation.utils import embeddings, embedding_store, tables
+from src.movieRecommendation.utils.stage_cache import StageCache, stage_fingerprint
+from src.movieRecommendation.utils.profiling import RunProfiler
+from src.movieRecommendation.components import (
+    data_ingestion,
+    data_transformation,
+    data_preparation,
+    model_trainer,
+    ann_index,
+    neighbor_table,
+)
 from src.movieRecommendation.pipeline.stage1_data_ingestion import (
     DataIngestionPipeline,
 )
@@ -11,48 +28,182 @@ from src.movieRecommendation.pipeline.stage3_data_cleaning import (
 from src.movieRecommendation.pipeline.stage4_model_trainer import (
     ModelTrainerPipeline,
 )
+from src.movieRecommendation.pipeline.stage5_ann_index import (
+    ANNIndexPipeline,
+)
+from src.movieRecommendation.pipeline.stage6_neighbor_table import (
+    NeighborTablePipeline,
+)
+
+
+@dataclass
+class Stage:
+    key: str
+    name: str
+    run: Callable[[], None]
+    # Config and params sections the stage reads
+    settings: dict
+    inputs: list
+    outputs: list
+    # Modules whose source is part of the stage's fingerprint
+    code: list
+
+
+def build_stages(config_manager):
+    config = config_manager.config
+    params = config_manager.params
+    embeddings_path = os.path.join(config.model_trainer.root_dir, "movie_embeddings.npy")
+    return [
+        Stage(
+            key="data_ingestion",
+            name="Data Ingestion Stage",
+            run=lambda: DataIngestionPipeline().initiate_data_ingestion(),
+            settings={"config": config.data_ingestion, "params": params.streaming},
+            # Downloaded by the stage itself when missing
+            inputs=[config.data_ingestion.local_data_file],
+            outputs=[os.path.join(config.data_ingestion.unzip_dir, "final.parquet")],
+            code=[data_ingestion, DataIngestionPipeline, tables],
+        ),
+        Stage(
+            key="data_transformation",
+            name="Data Transformation Stage",
+            run=lambda: DataTransformationPipeline().initiate_data_transformation(),
+            settings={"config": config.data_transformation, "params": params.streaming},
+            inputs=[os.path.join(config.data_transformation.data_path, "final.parquet")],
+            outputs=[os.path.join(config.data_transformation.root_dir, "transformed.parquet")],
+            code=[data_transformation, DataTransformationPipeline, tables],
+        ),
+        Stage(
+            key="data_preparation",
+            name="Data Preparation Stage",
+            run=lambda: DataPreparationPipeline().initiate_data_preparation(),
+            settings={
+                "config": config.data_preparation,
+                "params": [params.data_preparation, params.streaming],
+            },
+            inputs=[os.path.join(config.data_preparation.data_path, "transformed.parquet")],
+            outputs=[os.path.join(config.data_preparation.root_dir, "prepared.parquet")],
+            code=[data_preparation, DataPreparationPipeline, tables],
+        ),
+        Stage(
+            key="model_trainer",
+            name="Model Trainer Stage",
+            run=lambda: ModelTrainerPipeline().initiate_model_trainer(),
+            settings={"config": config.model_trainer, "params": params.model_trainer},
+            inputs=[os.path.join(config.model_trainer.data_path, "prepared.parquet")],
+            outputs=[embeddings_path, embeddings.digest_path(embeddings_path)],
+            code=[model_trainer, ModelTrainerPipeline, embeddings, embedding_store, tables],
+        ),
+        Stage(
+            key="ann_index",
+            name="ANN Index Stage",
+            run=lambda: ANNIndexPipeline().initiate_ann_index(),
+            settings={"config": config.ann_index, "params": params.ann_index},
+            inputs=[config.ann_index.embeddings_path],
+            outputs=[
+                os.path.join(config.ann_index.root_dir, f"{params.ann_index.backend}.npz"),
+                os.path.join(config.ann_index.root_dir, "ann_report.json"),
+            ],
+            code=[ann_index, ANNIndexPipeline, embeddings],
+        ),
+        Stage(
+            key="neighbor_table",
+            name="Neighbor Table Stage",
+            run=lambda: NeighborTablePipeline().initiate_neighbor_table(),
+            settings={"config": config.neighbor_table, "params": params.neighbor_table},
+            inputs=[config.neighbor_table.embeddings_path],
+            outputs=[
+                os.path.join(config.neighbor_table.root_dir, neighbor_table.NEIGHBOR_INDICES_FILE),
+                os.path.join(config.neighbor_table.root_dir, neighbor_table.NEIGHBOR_SCORES_FILE),
+                os.path.join(config.neighbor_table.root_dir, neighbor_table.NEIGHBOR_SOURCE_FILE),
+            ],
+            code=[neighbor_table, NeighborTablePipeline, embeddings],
+        ),
+    ]
+
+
+def fingerprint_stage(stage):
+    return stage_fingerprint(
+        stage.settings,
+        stage.inputs,
+        [inspect.getsourcefile(module) for module in stage.code],
+    )
+
+
+def parse_args(stage_keys, argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the movie recommendation pipeline, skipping stages whose outputs are up to date"
+    )
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument(
+        "--from-stage",
+        choices=stage_keys,
+        help="Skip the stages before this one and always run it and the ones after it",
+    )
+    selection.add_argument(
+        "--only",
+        nargs="+",
+        choices=stage_keys,
+        metavar="STAGE",
+        help=f"Always run just these stages, in pipeline order ({', '.join(stage_keys)})",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Run every selected stage even if it is up to date"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run each stage under cProfile and save its stats next to the run report",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    config_manager = ConfigurationManager()
+    stages = build_stages(config_manager)
+    stage_keys = [stage.key for stage in stages]
+    args = parse_args(stage_keys, argv)
+
+    forced = set(stage_keys) if args.force else set()
+    selected = stage_keys
+    if args.from_stage:
+        selected = stage_keys[stage_keys.index(args.from_stage) :]
+        forced.update(selected)
+    elif args.only:
+        selected = [key for key in stage_keys if key in args.only]
+        forced.update(selected)
+
+    cache = StageCache(config_manager.config.stage_cache_path)
+    profiler = RunProfiler(config_manager.config.run_report_dir, profile=args.profile)
+    for stage in stages:
+        if stage.key not in selected:
+            continue
+        STAGE_NAME = stage.name
+        # Fingerprinted before running, from the inputs the stage is about to read
+        fingerprint = fingerprint_stage(stage)
+        fetches_inputs = not all(os.path.exists(path) for path in stage.inputs)
+        if stage.key not in forced and cache.is_up_to_date(stage.key, fingerprint, stage.outputs):
+            logger.info(f">>>>>> Stage {STAGE_NAME} skipped <<<<<<")
+            logger.info(f"Inputs, settings and code of {stage.key} are unchanged; reusing its outputs")
+            profiler.skip(stage.key, STAGE_NAME)
+            continue
+
+        try:
+            logger.info(f">>>>>> Stage {STAGE_NAME} started <<<<<<")
+            # A run that fails halfway must not leave the old fingerprint behind
+            cache.invalidate(stage.key)
+            with profiler.stage(stage.key, STAGE_NAME):
+                stage.run()
+            if fetches_inputs:
+                # The stage created its own missing inputs, so fingerprint what it actually read
+                fingerprint = fingerprint_stage(stage)
+            cache.record(stage.key, fingerprint)
+            logger.info(f">>>>>> Stage {STAGE_NAME} completed <<<<<<")
+        except Exception as e:
+            logger.exception(f"Error in stage {STAGE_NAME}: {e}")
+            raise e
+    logger.info(f"Run report saved to: {os.path.join(profiler.report_dir, profiler.run_id + '.json')}")
+
 
-STAGE_NAME = "Data Ingestion Stage"
-
-try:
-    logger.info(f">>>>>> Stage {STAGE_NAME} started <<<<<<")
-    data_ingestion = DataIngestionPipeline()
-    data_ingestion.initiate_data_ingestion()
-    logger.info(f">>>>>> Stage {STAGE_NAME} completed <<<<<<")
-except Exception as e:
-    logger.exception(f"Error in stage {STAGE_NAME}: {e}")
-    raise e
-
-STAGE_NAME = "Data Transformation Stage"
-
-try:
-    logger.info(f">>>>>> Stage {STAGE_NAME} started <<<<<<")
-    data_transformation = DataTransformationPipeline()
-    data_transformation.initiate_data_transformation()
-    logger.info(f">>>>>> Stage {STAGE_NAME} completed <<<<<<")
-except Exception as e:
-    logger.exception(f"Error in stage {STAGE_NAME}: {e}")
-    raise e
-
-STAGE_NAME = "Data Preparation Stage"
-
-try:
-    logger.info(f">>>>>> Stage {STAGE_NAME} started <<<<<<")
-    data_preparation = DataPreparationPipeline()
-    data_preparation.initiate_data_preparation()
-    logger.info(f">>>>>> Stage {STAGE_NAME} completed <<<<<<")
-except Exception as e:
-    logger.exception(f"Error in stage {STAGE_NAME}: {e}")
-    raise e
-
-
-STAGE_NAME = "Model Trainer Stage"
-
-try:
-    logger.info(f">>>>>> Stage {STAGE_NAME} started <<<<<<")
-    model_trainer = ModelTrainerPipeline()
-    model_trainer.initiate_model_trainer()
-    logger.info(f">>>>>> Stage {STAGE_NAME} completed <<<<<<")
-except Exception as e:
-    logger.exception(f"Error in stage {STAGE_NAME}: {e}")
-    raise e
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import numpy as np
+from src.movieRecommendation.logging import logger
+from src.movieRecommendation.utils.profiling import timed_step
+from src.movieRecommendation.entity import ANNIndexConfig
+from src.movieRecommendation.utils.embeddings import (
+    load_embeddings,
+    normalize_embeddings,
+    read_embeddings_digest,
+    top_k_indices,
+)
+
+
+class IVFFlatIndex:
+    """Inverted-file index over unit-length embeddings.
+
+    Rows are clustered around `n_lists` centroids with spherical k-means and
+    stored as one contiguous id array per cluster (CSR layout). A query only
+    scores the rows of its `n_probe` closest clusters against the original
+    embedding matrix, so the index itself holds no copy of the vectors.
+    """
+
+    def __init__(self, centroids, offsets, ids, source_digest=None):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        # Digest of the embeddings the index was built from
+        self.source_digest = source_digest
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @property
+    def n_rows(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _assign(matrix, centroids, chunk_size=65536):
+        labels = np.empty(len(matrix), dtype=np.int32)
+        for start in range(0, len(matrix), chunk_size):
+            block = matrix[start : start + chunk_size]
+            labels[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return labels
+
+    @classmethod
+    def build(cls, embeddings, n_lists=0, n_iter=10, train_sample=100000, seed=42):
+        """Clusters normalized embeddings into an IVF index.
+
+        Args:
+            embeddings (np.ndarray): Row-normalized float32 matrix.
+            n_lists (int): Number of clusters, 0 picks sqrt(n_rows).
+            n_iter (int): Number of k-means iterations.
+            train_sample (int): Maximum number of rows used to fit the centroids.
+            seed (int): Seed for sampling and centroid initialisation.
+
+        Returns:
+            IVFFlatIndex: The built index.
+        """
+        n_rows = len(embeddings)
+        if n_lists <= 0:
+            n_lists = int(np.sqrt(n_rows))
+        n_lists = max(1, min(n_lists, n_rows))
+
+        rng = np.random.default_rng(seed)
+        if n_rows > train_sample:
+            train = embeddings[np.sort(rng.choice(n_rows, train_sample, replace=False))]
+        else:
+            train = embeddings
+        centroids = train[rng.choice(len(train), n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            labels = cls._assign(train, centroids)
+            order = np.argsort(labels, kind="stable")
+            counts = np.bincount(labels, minlength=n_lists)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            filled = counts > 0
+            # Consecutive non-empty starts delimit each cluster's rows
+            sums = np.zeros_like(centroids)
+            sums[filled] = np.add.reduceat(train[order], starts[filled], axis=0)
+            centroids = normalize_embeddings(sums)
+            empty = np.flatnonzero(~filled)
+            if len(empty):
+                centroids[empty] = train[rng.choice(len(train), len(empty), replace=False)]
+
+        labels = cls._assign(embeddings, centroids)
+        ids = np.argsort(labels, kind="stable").astype(np.int32)
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=n_lists))))
+        return cls(centroids, offsets.astype(np.int64), ids)
+
+    def search(self, embeddings, query, k, n_probe=8):
+        """Returns the approximate top-k rows for a unit-length query vector.
+
+        Args:
+            embeddings (np.ndarray): The matrix the index was built from.
+            query (np.ndarray): A 1D unit-length query vector.
+            k (int): Number of neighbors to return.
+            n_probe (int): Number of clusters to scan.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Row indices and their similarity scores, best first.
+        """
+        probe = top_k_indices(self.centroids @ query, n_probe)
+        candidates = np.concatenate(
+            [self.ids[self.offsets[cluster] : self.offsets[cluster + 1]] for cluster in probe]
+        )
+        scores = embeddings[candidates] @ query
+        best = top_k_indices(scores, k)
+        return candidates[best], scores[best]
+
+    def save(self, path):
+        tmp_path = str(path) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                offsets=self.offsets,
+                ids=self.ids,
+                source_digest=np.array(self.source_digest or ""),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            source_digest = str(data["source_digest"]) if "source_digest" in data else ""
+            return cls(data["centroids"], data["offsets"], data["ids"], source_digest or None)
+
+
+# Available approximate search backends, keyed by the name used in params.yaml
+ANN_BACKENDS = {"ivf_flat": IVFFlatIndex}
+
+
+class ANNIndexBuilder:
+    def __init__(self, config: ANNIndexConfig):
+        self.config = config
+
+    def load_embeddings(self):
+        logger.info(f"Loading embeddings from: {self.config.embeddings_path}")
+        return load_embeddings(self.config.embeddings_path)
+
+    def evaluate(self, index, embeddings):
+        """Measures recall@k and per-query latency of the index against exact search"""
+        k = self.config.report_k
+        rng = np.random.default_rng(self.config.seed)
+        n_queries = min(self.config.report_queries, len(embeddings))
+        queries = rng.choice(len(embeddings), n_queries, replace=False)
+
+        exact_results, exact_latencies = [], []
+        for row in queries:
+            start = time.perf_counter()
+            exact_results.append(set(top_k_indices(embeddings @ embeddings[row], k).tolist()))
+            exact_latencies.append(time.perf_counter() - start)
+
+        report = {
+            "backend": self.config.backend,
+            "n_rows": int(len(embeddings)),
+            "n_lists": int(index.n_lists),
+            "k": int(k),
+            "n_queries": int(n_queries),
+            "exact": {
+                "mean_latency_ms": round(float(np.mean(exact_latencies)) * 1000, 4),
+                "p95_latency_ms": round(float(np.percentile(exact_latencies, 95)) * 1000, 4),
+            },
+            "approximate": [],
+        }
+        for n_probe in self.config.report_n_probe:
+            recalls, latencies = [], []
+            for row, expected in zip(queries, exact_results):
+                start = time.perf_counter()
+                found, _ = index.search(embeddings, embeddings[row], k, n_probe)
+                latencies.append(time.perf_counter() - start)
+                recalls.append(len(expected.intersection(found.tolist())) / len(expected))
+            report["approximate"].append(
+                {
+                    "n_probe": int(n_probe),
+                    "recall_at_k": round(float(np.mean(recalls)), 4),
+                    "mean_latency_ms": round(float(np.mean(latencies)) * 1000, 4),
+                    "p95_latency_ms": round(float(np.percentile(latencies, 95)) * 1000, 4),
+                }
+            )
+            logger.info(
+                f"n_probe={n_probe}: recall@{k}={report['approximate'][-1]['recall_at_k']}, "
+                f"mean latency={report['approximate'][-1]['mean_latency_ms']} ms"
+            )
+        return report
+
+    def build(self):
+        logger.info(f"Building '{self.config.backend}' ANN index")
+        embeddings = self.load_embeddings()
+        logger.info(f"Loaded embeddings with shape: {embeddings.shape}")
+
+        index_cls = ANN_BACKENDS[self.config.backend]
+        with timed_step("build index"):
+            index = index_cls.build(
+                embeddings,
+                n_lists=self.config.n_lists,
+                n_iter=self.config.n_iter,
+                train_sample=self.config.train_sample,
+                seed=self.config.seed,
+            )
+        index.source_digest = read_embeddings_digest(self.config.embeddings_path)
+        logger.info(f"Index built with {index.n_lists} lists over {index.n_rows} rows")
+
+        index_path = os.path.join(self.config.root_dir, f"{self.config.backend}.npz")
+        index.save(index_path)
+        logger.info(f"ANN index saved to: {index_path}")
+
+        with timed_step("evaluate recall and latency"):
+            report = self.evaluate(index, embeddings)
+        report_path = os.path.join(self.config.root_dir, "ann_report.json")
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=4)
+        logger.info(f"Recall/latency report saved to: {report_path}")
+        logger.info("ANN index build completed successfully")
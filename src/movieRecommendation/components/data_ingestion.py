@@ -1,8 +1,10 @@
 import os
 import zipfile
 import gdown
+import pandas as pd
 from src.movieRecommendation.logging import logger
 from src.movieRecommendation.entity import DataIngestionConfig
+from src.movieRecommendation.utils.tables import ParquetChunkWriter, infer_csv_dtypes, write_table
 
 
 class DataIngestion:
@@ -28,3 +30,30 @@ class DataIngestion:
             logger.info(f"Extracting dataset to {unzip_path}...")
             zip_ref.extractall(unzip_path)
             logger.info("Extraction complete.")
+
+    def convert_to_parquet(self):
+        # Later stages and the app read Parquet, loading only the columns they need
+        csv_path = os.path.join(self.config.unzip_dir, "final.csv")
+        parquet_path = os.path.join(self.config.unzip_dir, "final.parquet")
+        logger.info(f"Converting {csv_path} to Parquet...")
+        df = pd.read_csv(csv_path)
+        write_table(df, parquet_path)
+        logger.info(f"Saved {df.shape[0]} rows to {parquet_path}")
+
+    def stream_to_parquet(self):
+        # Reads final.csv straight out of the zip, never extracting it or loading it whole
+        parquet_path = os.path.join(self.config.unzip_dir, "final.parquet")
+        chunk_size = self.config.stream_chunk_size
+        os.makedirs(self.config.unzip_dir, exist_ok=True)
+        with zipfile.ZipFile(self.config.local_data_file, "r") as zip_ref:
+            members = [name for name in zip_ref.namelist() if os.path.basename(name) == "final.csv"]
+            if not members:
+                raise FileNotFoundError(f"final.csv not found in {self.config.local_data_file}")
+            # A first pass fixes one dtype per column, since chunks infer their own
+            with zip_ref.open(members[0]) as csv_file:
+                dtypes = infer_csv_dtypes(pd.read_csv(csv_file, chunksize=chunk_size))
+            logger.info(f"Streaming {members[0]} to {parquet_path} in chunks of {chunk_size} rows...")
+            with zip_ref.open(members[0]) as csv_file, ParquetChunkWriter(parquet_path) as writer:
+                for chunk in pd.read_csv(csv_file, chunksize=chunk_size, dtype=dtypes):
+                    writer.write(chunk)
+        logger.info(f"Saved {writer.n_rows} rows to {parquet_path}")
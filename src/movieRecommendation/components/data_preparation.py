@@ -1,20 +1,53 @@
 import os
 import re
-import pandas as pd
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
 from nltk.corpus import stopwords
 from nltk.tokenize import RegexpTokenizer
 from nltk.stem import WordNetLemmatizer
 from nltk.tokenize import word_tokenize
 from src.movieRecommendation.logging import logger
 from src.movieRecommendation.entity import DataPreparationConfig
+from src.movieRecommendation.utils.profiling import timed_step
+from src.movieRecommendation.utils.tables import (
+    ParquetChunkWriter,
+    iter_table_chunks,
+    read_table,
+    write_table,
+)
+
+PUNCTUATION_TOKENIZER = RegexpTokenizer(r"[\w-]+")
+NUMBER_PATTERN = re.compile(r"[0-9]")
+
+# Per-process cleaner used by the worker pool, created by _init_worker
+_worker_preparation = None
+
+
+def _init_worker():
+    global _worker_preparation
+    _worker_preparation = DataPreparation(config=None)
+
+
+def _clean_chunk(texts):
+    return [_worker_preparation.clean_description(text) for text in texts]
 
 
 class DataPreparation:
     def __init__(self, config: DataPreparationConfig):
         self.config = config
         self.lemmatizer = WordNetLemmatizer()
+        self._stop_words = None
+        # Punctuation-free token -> cleaned output words; vocabularies repeat heavily
+        self._token_cache = {}
         logger.info("DataPreparation initialized")
 
+    @property
+    def stop_words(self):
+        # Loaded from the NLTK corpus once per instance rather than once per call
+        if self._stop_words is None:
+            self._stop_words = set(stopwords.words("english"))
+        return self._stop_words
+
     def make_lower_case(self, text):
         text_lower = None
         text_lower = text.lower()
@@ -22,20 +55,18 @@ class DataPreparation:
 
     def remove_stop_words(self, text):
         text = text.split()
-        stop_words = set(stopwords.words("english"))
+        stop_words = self.stop_words
         removed_stop_word_text = None
         filtered_words = [word for word in text if word not in stop_words]
         removed_stop_word_text = " ".join(filtered_words)
         return removed_stop_word_text
 
     def remove_numbers(self, text):
-        pattern = r"[0-9]"
-        removed_numbers_text = re.sub(pattern, "", text)
+        removed_numbers_text = NUMBER_PATTERN.sub("", text)
         return removed_numbers_text
 
     def remove_punctuation(self, text):
-        tokenizer = RegexpTokenizer(r"[\w-]+")
-        tokens = tokenizer.tokenize(text)
+        tokens = PUNCTUATION_TOKENIZER.tokenize(text)
         removed_punctuation_text = " ".join(tokens)
         return removed_punctuation_text
 
@@ -44,63 +75,126 @@ class DataPreparation:
         lemmatized = [self.lemmatizer.lemmatize(token.lower()) for token in tokens]
         return " ".join(lemmatized)
 
+    def clean_token(self, token):
+        """Removes numbers from, lemmatizes and stop-word filters one token (memoized)"""
+        cleaned = self._token_cache.get(token)
+        if cleaned is None:
+            stripped = NUMBER_PATTERN.sub("", token)
+            words = word_tokenize(stripped) if stripped else []
+            lemmas = [self.lemmatizer.lemmatize(word.lower()) for word in words]
+            cleaned = tuple(
+                part
+                for lemma in lemmas
+                for part in lemma.split()
+                if part not in self.stop_words
+            )
+            self._token_cache[token] = cleaned
+        return cleaned
+
+    def clean_description(self, text):
+        """Runs every preprocessing step on one description in a single token pass.
+
+        Produces the same output as chaining make_lower_case, remove_punctuation,
+        remove_numbers, lemmatize_text and remove_stop_words. After punctuation
+        removal only word characters and hyphens are left, so word_tokenize never
+        joins or splits across whitespace and each token can be cleaned on its own.
+        """
+        cleaned = []
+        for token in PUNCTUATION_TOKENIZER.tokenize(text.lower()):
+            cleaned.extend(self.clean_token(token))
+        return " ".join(cleaned)
+
+    def worker_pool(self):
+        """Returns a process pool for cleaning, or a null context when n_workers <= 1"""
+        if self.config.n_workers <= 1:
+            return nullcontext()
+        return ProcessPoolExecutor(max_workers=self.config.n_workers, initializer=_init_worker)
+
+    def clean_descriptions(self, texts, executor=None):
+        """Cleans a list of descriptions, in chunks across a process pool if configured.
+
+        A running pool can be passed as executor so that its workers, with
+        their loaded corpora and warm token caches, are reused across calls.
+        """
+        n_workers = self.config.n_workers
+        chunk_size = self.config.chunk_size
+        if n_workers <= 1 or len(texts) <= chunk_size:
+            logger.info(f"Cleaning {len(texts)} descriptions in a single process")
+            return [self.clean_description(text) for text in texts]
+
+        chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        logger.info(
+            f"Cleaning {len(texts)} descriptions in {len(chunks)} chunks "
+            f"across {n_workers} worker processes"
+        )
+        cleaned = []
+        with nullcontext(executor) if executor is not None else self.worker_pool() as pool:
+            # map() yields chunk results in submission order, keeping rows aligned
+            for chunk_result in pool.map(_clean_chunk, chunks):
+                cleaned.extend(chunk_result)
+        return cleaned
+
+    def prepare_frame(self, df, executor=None):
+        """Replaces concat_description with cleaned_description in a copy of df"""
+        df_cleaned = df.copy()
+        with timed_step("clean descriptions"):
+            df_cleaned["cleaned_description"] = self.clean_descriptions(
+                df["concat_description"].tolist(), executor
+            )
+        df_cleaned.drop(columns=["concat_description"], inplace=True)
+        return df_cleaned
+
+    def log_sample(self, df, df_cleaned):
+        if len(df_cleaned) > 0:
+            sample_original = df["concat_description"].iloc[0][:100]
+            sample_cleaned = df_cleaned["cleaned_description"].iloc[0][:100]
+            logger.info(f"Sample original text: {sample_original}...")
+            logger.info(f"Sample cleaned text: {sample_cleaned}...")
+
     def prepare(self):
-        csv_path = os.path.join(self.config.data_path, "transformed.csv")
-        logger.info(f"Starting data preparation from: {csv_path}")
+        data_file = os.path.join(self.config.data_path, "transformed.parquet")
+        output_path = os.path.join(self.config.root_dir, "prepared.parquet")
+        logger.info(f"Starting data preparation from: {data_file}")
+        logger.info(
+            "Steps: lowercase, remove punctuation, remove numbers, lemmatize, remove stop words"
+        )
+
+        if self.config.streaming:
+            # One chunk in memory at a time, appended to the output as it is done.
+            # The pool outlives the chunks so workers load NLTK data only once.
+            chunk_size = self.config.stream_chunk_size
+            logger.info(f"Streaming {data_file} in chunks of {chunk_size} rows")
+            with self.worker_pool() as executor, ParquetChunkWriter(output_path) as writer:
+                for chunk in iter_table_chunks(data_file, chunk_size):
+                    chunk_cleaned = self.prepare_frame(chunk, executor)
+                    if writer.n_rows == 0:
+                        self.log_sample(chunk, chunk_cleaned)
+                    with timed_step("write chunk"):
+                        writer.write(chunk_cleaned)
+                    logger.info(f"Prepared {writer.n_rows} rows so far")
+            logger.info(f"Prepared data saved to: {output_path}")
+            logger.info("Data preparation completed successfully")
+            return
 
         # Load data
-        df = pd.read_csv(csv_path)
+        with timed_step("load data"):
+            df = read_table(data_file)
         logger.info(f"Loaded dataframe with shape: {df.shape}")
         logger.info(f"Columns in dataframe: {list(df.columns)}")
 
-        # Create copy for cleaning
-        df_cleaned = df.copy()
-        logger.info("Created copy of dataframe for cleaning")
-
         # Apply text preprocessing pipeline
         logger.info(
             "Starting text preprocessing pipeline on 'concat_description' column"
         )
-
-        logger.info("Step 1/5: Converting text to lowercase")
-        df_cleaned["cleaned_description"] = df["concat_description"].apply(
-            self.make_lower_case
-        )
-
-        logger.info("Step 2/5: Removing punctuation")
-        df_cleaned["cleaned_description"] = df_cleaned["cleaned_description"].apply(
-            self.remove_punctuation
-        )
-
-        logger.info("Step 3/5: Removing numbers")
-        df_cleaned["cleaned_description"] = df_cleaned["cleaned_description"].apply(
-            self.remove_numbers
-        )
-
-        logger.info("Step 4/5: Lemmatizing text")
-        df_cleaned["cleaned_description"] = df_cleaned["cleaned_description"].apply(
-            self.lemmatize_text
-        )
-
-        logger.info("Step 5/5: Removing stop words")
-        df_cleaned["cleaned_description"] = df_cleaned["cleaned_description"].apply(
-            self.remove_stop_words
-        )
-
+        df_cleaned = self.prepare_frame(df)
         logger.info("Text preprocessing pipeline completed")
-
-        df_cleaned.drop(columns=["concat_description"], inplace=True)
         logger.info("Removed the concat_description column")
         # Log sample of cleaned text
-        if len(df_cleaned) > 0:
-            sample_original = df["concat_description"].iloc[0][:100]
-            sample_cleaned = df_cleaned["cleaned_description"].iloc[0][:100]
-            logger.info(f"Sample original text: {sample_original}...")
-            logger.info(f"Sample cleaned text: {sample_cleaned}...")
+        self.log_sample(df, df_cleaned)
 
         # Save prepared data
-        output_path = os.path.join(self.config.root_dir, "prepared.csv")
-        df_cleaned.to_csv(output_path, index=False)
+        with timed_step("save data"):
+            write_table(df_cleaned, output_path)
         logger.info(f"Prepared data saved to: {output_path}")
         logger.info(f"Final dataframe shape: {df_cleaned.shape}")
         logger.info("Data preparation completed successfully")
@@ -2,6 +2,37 @@ import os
 import pandas as pd
 from src.movieRecommendation.logging import logger
 from src.movieRecommendation.entity import DataTransformationConfig
+from src.movieRecommendation.utils.profiling import timed_step
+from src.movieRecommendation.utils.tables import (
+    ParquetChunkWriter,
+    iter_table_chunks,
+    read_table,
+    write_table,
+)
+
+
+# Patterns avoid \s and spell characters out, so they behave the same under
+# Python's re (object columns) and RE2 (pyarrow-backed string columns).
+_UNICODE_SPACES = "\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000"
+# Every character str.isspace() accepts
+WHITESPACE = r"[\t\n\x0b\x0c\r\x1c-\x1f \x85" + _UNICODE_SPACES + "]"
+# Whitespace Python's tokenizer accepts between list items
+_LIST_SPACE = r"[ \t\f\r\n]*"
+# Item text without quotes, backslashes, control characters or whitespace other
+# than plain spaces, so ast.literal_eval would keep it as-is and strip() only
+# has spaces to remove
+_ITEM_TEXT = r"""[^'"\\\x00-\x1f\x7f-\x9f""" + _UNICODE_SPACES + "]*"
+_LIST_ITEM = rf"""(?:'{_ITEM_TEXT}'|"{_ITEM_TEXT}")"""
+# List literals of plain quoted strings, e.g. "['Action', 'Comedy']"
+SIMPLE_LIST_PATTERN = (
+    rf"\[{_LIST_SPACE}(?:{_LIST_ITEM}(?:{_LIST_SPACE},{_LIST_SPACE}{_LIST_ITEM})*)?{_LIST_SPACE}\]"
+)
+# In a simple list quotes only delimit items, so rewriting the brackets, the
+# separators and the empty list leaves the stripped items joined by ", "
+LIST_OPEN_PATTERN = rf"""^\[{_LIST_SPACE}['"] *"""
+LIST_CLOSE_PATTERN = rf""" *['"]{_LIST_SPACE}\]$"""
+LIST_SEPARATOR_PATTERN = rf""" *['"]{_LIST_SPACE},{_LIST_SPACE}['"] *"""
+EMPTY_LIST_PATTERN = rf"^\[{_LIST_SPACE}\]$"
 
 
 class DataTransformation:
@@ -49,6 +80,26 @@ class DataTransformation:
         except:  # noqa: E722
             return str(x)
 
+    def clean_genres_column(self, genres):
+        """Vectorized clean_genres: parses simple list literals with regexes and
+        falls back to the row-wise parser for anything else"""
+        is_simple = genres.str.fullmatch(SIMPLE_LIST_PATTERN).fillna(False).astype(bool)
+        cleaned = pd.Series("", index=genres.index, dtype=object)
+        cleaned[is_simple] = (
+            genres[is_simple]
+            .str.replace(LIST_OPEN_PATTERN, "", regex=True)
+            .str.replace(LIST_CLOSE_PATTERN, "", regex=True)
+            .str.replace(LIST_SEPARATOR_PATTERN, ", ", regex=True)
+            .str.replace(EMPTY_LIST_PATTERN, "", regex=True)
+        )
+        cleaned[~is_simple] = genres[~is_simple].map(self.clean_genres)
+        logger.info(f"Parsed {int(is_simple.sum())} genre lists with the vectorized parser")
+        return cleaned
+
+    def clean_production_companies(self, companies):
+        """Removes spaces inside company names, keeping ", " between companies"""
+        return companies.str.replace(" ", "", regex=False).str.replace(",", ", ", regex=False)
+
     def concat_features(self, df):
         logger.info("Starting feature concatenation")
         df["concat_description"] = (
@@ -82,37 +133,71 @@ class DataTransformation:
         genres_weighted = " ".join(genres_list * genre_weight)
         return row["concat_description"] + " " + genres_weighted
 
-    def transform(self):
-        csv_path = os.path.join(self.config.data_path, "final.csv")
-        logger.info(f"Starting data transformation from: {csv_path}")
-
-        # Load data
-        df = pd.read_csv(csv_path)
-        logger.info(f"Loaded dataframe with shape: {df.shape}")
-
-        # Drop columns
-        df = self.drop_columns(df)
-
-        # Clean genres
-        logger.info("Cleaning genres column")
-        df["genres"] = df["genres"].apply(self.clean_genres)
-        logger.info("Genres cleaning completed")
-
-        # Clean production companies
-        logger.info("Cleaning production_companies column")
-        df["production_companies"] = df["production_companies"].apply(
-            lambda x: ", ".join([c.replace(" ", "") for c in x.split(",")])
+    def weight_descriptions(self, df, genre_weight=3):
+        """Vectorized weight_description over the whole frame"""
+        # Strip the outer whitespace first so empty edge genres are kept like split(",") does
+        genres = (
+            df["genres"]
+            .str.replace(rf"^{WHITESPACE}+|{WHITESPACE}+$", "", regex=True)
+            .str.replace(rf"{WHITESPACE}*,{WHITESPACE}*", " ", regex=True)
         )
-        logger.info("Production companies cleaning completed")
+        if genre_weight <= 0:
+            return df["concat_description"] + " "
+        genres_weighted = genres
+        for _ in range(genre_weight - 1):
+            genres_weighted = genres_weighted + " " + genres
+        return df["concat_description"] + " " + genres_weighted
 
+    def transform_frame(self, df):
+        """Runs every transformation step on one dataframe (or chunk of one)"""
+        with timed_step("drop columns"):
+            df = self.drop_columns(df)
+        with timed_step("clean genres"):
+            df["genres"] = self.clean_genres_column(df["genres"])
+        with timed_step("clean production companies"):
+            df["production_companies"] = self.clean_production_companies(
+                df["production_companies"]
+            )
         # Concatenate features
-        df = self.concat_features(df)
+        with timed_step("concatenate features"):
+            df = self.concat_features(df)
         # Weight the description using the genres colum
-        df["concat_description"] = df.apply(self.weight_description, axis=1)
+        with timed_step("weight genres"):
+            df["concat_description"] = self.weight_descriptions(df)
         df.drop(columns=["genres"], inplace=True)
+        return df
+
+    def transform(self):
+        data_file = os.path.join(self.config.data_path, "final.parquet")
+        output_path = os.path.join(self.config.root_dir, "transformed.parquet")
+        logger.info(f"Starting data transformation from: {data_file}")
+        logger.info(
+            "Steps: drop columns, clean genres, clean production companies, "
+            "concatenate features, weight genres"
+        )
+
+        if self.config.streaming:
+            # One chunk in memory at a time, appended to the output as it is done
+            chunk_size = self.config.stream_chunk_size
+            logger.info(f"Streaming {data_file} in chunks of {chunk_size} rows")
+            with ParquetChunkWriter(output_path) as writer:
+                for chunk in iter_table_chunks(data_file, chunk_size):
+                    df = self.transform_frame(chunk)
+                    with timed_step("write chunk"):
+                        writer.write(df)
+                    logger.info(f"Transformed {writer.n_rows} rows so far")
+            logger.info(f"Transformed data saved to: {output_path}")
+            logger.info("Data transformation completed successfully")
+            return
+
+        # Load data
+        with timed_step("load data"):
+            df = read_table(data_file)
+        logger.info(f"Loaded dataframe with shape: {df.shape}")
+        df = self.transform_frame(df)
         # Save transformed data
-        output_path = os.path.join(self.config.root_dir, "transformed.csv")
-        df.to_csv(output_path, index=False)
+        with timed_step("save data"):
+            write_table(df, output_path)
         logger.info(f"Transformed data saved to: {output_path}")
         logger.info(f"Final dataframe shape: {df.shape}")
         logger.info("Data transformation completed successfully")
@@ -1,11 +1,19 @@
 import os
-import pickle
-import pandas as pd
+import json
+import shutil
+import hashlib
 import numpy as np
 from src.movieRecommendation.logging import logger
 from src.movieRecommendation.entity import ModelTrainerConfig
+from src.movieRecommendation.utils.embeddings import save_embeddings
+from src.movieRecommendation.utils.embedding_store import EmbeddingStore, content_key
+from src.movieRecommendation.utils.tables import read_table
+from src.movieRecommendation.utils.profiling import timed_step
 from langchain_huggingface import HuggingFaceEmbeddings
 
+CHECKPOINT_VECTORS_FILE = "vectors.npy"
+CHECKPOINT_PROGRESS_FILE = "progress.json"
+
 
 class ModelTrainer:
     def __init__(self, config: ModelTrainerConfig):
@@ -17,34 +25,119 @@ class ModelTrainer:
         logger.info("HuggingFace embedding model loaded successfully")
         return embedding
 
+    def embed_documents(self, embedding, texts):
+        """Embeds texts in batches into a preallocated float32 memmap.
+
+        Texts are batched in order of length so each batch pads to a similar
+        size. The memmap and the number of finished batches are checkpointed
+        every few batches. A rerun over the same texts with the same model and
+        batch size resumes after the last checkpoint.
+
+        Args:
+            embedding (HuggingFaceEmbeddings): The loaded embedding model.
+            texts (list[str]): The texts to embed.
+
+        Returns:
+            np.ndarray: A float32 matrix with one row per text, in input order.
+        """
+        batch_size = self.config.batch_size
+        checkpoint_dir = self.config.checkpoint_dir
+        vectors_path = os.path.join(checkpoint_dir, CHECKPOINT_VECTORS_FILE)
+        progress_path = os.path.join(checkpoint_dir, CHECKPOINT_PROGRESS_FILE)
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batches = [order[i : i + batch_size] for i in range(0, len(order), batch_size)]
+        fingerprint = hashlib.sha256(
+            "\0".join([self.config.model_name, str(batch_size), *texts]).encode("utf-8")
+        ).hexdigest()
+
+        vectors = None
+        completed = 0
+        if os.path.exists(progress_path) and os.path.exists(vectors_path):
+            with open(progress_path) as f:
+                progress = json.load(f)
+            if progress["fingerprint"] == fingerprint:
+                vectors = np.load(vectors_path, mmap_mode="r+")
+                completed = progress["completed_batches"]
+                logger.info(f"Resuming embedding from checkpoint at batch {completed}/{len(batches)}")
+
+        for batch_number in range(completed, len(batches)):
+            rows = batches[batch_number]
+            batch_vectors = np.asarray(
+                embedding.embed_documents([texts[i] for i in rows]), dtype=np.float32
+            )
+            if vectors is None:
+                # Drop any checkpoint of other texts before reusing its files
+                shutil.rmtree(checkpoint_dir, ignore_errors=True)
+                os.makedirs(checkpoint_dir, exist_ok=True)
+                vectors = np.lib.format.open_memmap(
+                    vectors_path,
+                    mode="w+",
+                    dtype=np.float32,
+                    shape=(len(texts), batch_vectors.shape[1]),
+                )
+            vectors[rows] = batch_vectors
+
+            done = batch_number + 1
+            if done % self.config.checkpoint_every == 0 or done == len(batches):
+                vectors.flush()
+                tmp_path = progress_path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump({"fingerprint": fingerprint, "completed_batches": done}, f)
+                os.replace(tmp_path, progress_path)
+                logger.info(f"Embedded {done}/{len(batches)} batches")
+
+        if vectors is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return vectors
+
     def train(self):
         logger.info("Starting model training")
 
         # Load data
-        data_file = os.path.join(self.config.data_path, "prepared.csv")
+        data_file = os.path.join(self.config.data_path, "prepared.parquet")
         logger.info(f"Loading prepared data from: {data_file}")
-        df = pd.read_csv(data_file)
+        # Only the descriptions are needed to embed
+        with timed_step("load data"):
+            df = read_table(data_file, columns=["cleaned_description"])
         logger.info(f"Loaded dataframe with shape: {df.shape}")
 
         # Extract descriptions
         descriptions = df["cleaned_description"].tolist()
         logger.info(f"Extracted {len(descriptions)} movie descriptions")
 
-        # Load embedding model
-        embedding = self.load_hf_embedding()
+        # Reuse vectors of descriptions embedded by an earlier run with this model
+        with timed_step("load embedding store"):
+            keys = [content_key(self.config.model_name, text) for text in descriptions]
+            store = EmbeddingStore.load(self.config.embedding_store_dir)
+        logger.info(f"Loaded embedding store with {len(store)} vectors")
+
+        def embed_rows(positions):
+            with timed_step("load embedding model"):
+                embedding = self.load_hf_embedding()
+            logger.info(
+                f"Generating embeddings for {len(positions)} new or changed descriptions "
+                "(this may take a while)..."
+            )
+            with timed_step("embed descriptions"):
+                return self.embed_documents(embedding, [descriptions[i] for i in positions])
 
-        # Generate embeddings
-        logger.info("Generating embeddings for all movies (this may take a while)...")
-        movie_embedding = np.array(embedding.embed_documents(descriptions))
+        movie_embedding, n_embedded = store.assemble(keys, embed_rows)
         logger.info(
-            f"Embeddings generated successfully. Shape: {movie_embedding.shape}"
+            f"Embeddings ready: {n_embedded} embedded, "
+            f"{len(descriptions) - n_embedded} reused. Shape: {movie_embedding.shape}"
         )
+        with timed_step("save embedding store"):
+            EmbeddingStore.save(self.config.embedding_store_dir, keys, movie_embedding)
+        logger.info(f"Embedding store saved to: {self.config.embedding_store_dir}")
+        # The new vectors are in the store now, so the checkpoint is no longer needed
+        shutil.rmtree(self.config.checkpoint_dir, ignore_errors=True)
 
-        # Save embeddings
-        embeddings_path = os.path.join(self.config.root_dir, "movie_embeddings.pkl")
+        # Save normalized float32 embeddings so the app can memory-map them as-is
+        embeddings_path = os.path.join(self.config.root_dir, "movie_embeddings.npy")
         logger.info(f"Saving embeddings to: {embeddings_path}")
-        with open(embeddings_path, "wb") as f:
-            pickle.dump(movie_embedding, f)
+        with timed_step("save embeddings"):
+            save_embeddings(movie_embedding, embeddings_path)
         logger.info("Embeddings saved successfully")
 
         logger.info("Model training completed successfully")
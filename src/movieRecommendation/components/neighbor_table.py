@@ -0,0 +1,129 @@
+import os
+import json
+import numpy as np
+from src.movieRecommendation.logging import logger
+from src.movieRecommendation.utils.profiling import timed_step
+from src.movieRecommendation.entity import NeighborTableConfig
+from src.movieRecommendation.utils.embeddings import (
+    load_embeddings,
+    read_embeddings_digest,
+    save_array,
+)
+
+NEIGHBOR_INDICES_FILE = "neighbor_indices.npy"
+NEIGHBOR_SCORES_FILE = "neighbor_scores.npy"
+# Digest of the embeddings the table was computed from
+NEIGHBOR_SOURCE_FILE = "source.json"
+
+
+def _row_top_k(scores, ids, k):
+    """Keeps the k highest scores of every row along with their ids (unsorted)"""
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(scores, part, axis=1), np.take_along_axis(ids, part, axis=1)
+
+
+class NeighborTable:
+    """Precomputed top-K neighbors of every movie.
+
+    Row i holds the K most similar movies to movie i (excluding itself) in
+    descending order, so serving a request with N <= K is an array slice.
+    """
+
+    def __init__(self, indices, scores, source_digest=None):
+        self.indices = indices
+        self.scores = scores
+        self.source_digest = source_digest
+
+    @property
+    def top_k(self):
+        return self.indices.shape[1]
+
+    @property
+    def n_rows(self):
+        return self.indices.shape[0]
+
+    def lookup(self, row, n):
+        """Returns the first n neighbor rows and scores, or None if n is negative or exceeds K."""
+        if n < 0 or n > self.top_k:
+            return None
+        return self.indices[row, :n], self.scores[row, :n].astype(np.float32)
+
+    @classmethod
+    def load(cls, root_dir):
+        indices = np.load(os.path.join(root_dir, NEIGHBOR_INDICES_FILE), mmap_mode="r")
+        scores = np.load(os.path.join(root_dir, NEIGHBOR_SCORES_FILE), mmap_mode="r")
+        source_digest = None
+        source_path = os.path.join(root_dir, NEIGHBOR_SOURCE_FILE)
+        if os.path.exists(source_path):
+            with open(source_path) as f:
+                source_digest = json.load(f).get("embeddings_digest")
+        return cls(indices, scores, source_digest)
+
+
+class NeighborTableBuilder:
+    def __init__(self, config: NeighborTableConfig):
+        self.config = config
+
+    def compute(self, embeddings):
+        """Computes every row's top-K neighbors with blocked matrix multiplies.
+
+        Each step scores a block of `row_block_size` queries against a chunk of
+        `column_chunk_size` movies, so peak memory is bounded by the block
+        product rather than the full N x N similarity matrix.
+        """
+        n_rows = len(embeddings)
+        # One extra slot for the movie itself, dropped after sorting
+        k = min(self.config.top_k + 1, n_rows)
+        row_block = self.config.row_block_size
+        column_chunk = self.config.column_chunk_size
+
+        indices = np.empty((n_rows, k - 1), dtype=np.int32)
+        scores = np.empty((n_rows, k - 1), dtype=np.float16)
+
+        for row_start in range(0, n_rows, row_block):
+            queries = embeddings[row_start : row_start + row_block]
+            best_scores = np.empty((len(queries), 0), dtype=np.float32)
+            best_ids = np.empty((len(queries), 0), dtype=np.int32)
+            for column_start in range(0, n_rows, column_chunk):
+                block = embeddings[column_start : column_start + column_chunk]
+                block_scores = queries @ block.T
+                block_ids = np.arange(column_start, column_start + len(block), dtype=np.int32)
+                block_ids = np.broadcast_to(block_ids, block_scores.shape)
+                best_scores, best_ids = _row_top_k(
+                    np.concatenate((best_scores, block_scores), axis=1),
+                    np.concatenate((best_ids, block_ids), axis=1),
+                    k,
+                )
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            best_ids = np.take_along_axis(best_ids, order, axis=1)
+            # The top hit is the movie itself, matching the live scoring path
+            row_end = row_start + len(queries)
+            indices[row_start:row_end] = best_ids[:, 1:]
+            scores[row_start:row_end] = best_scores[:, 1:]
+            logger.info(f"Computed neighbors for {row_end}/{n_rows} movies")
+
+        return NeighborTable(indices, scores)
+
+    def build(self):
+        logger.info(f"Building top-{self.config.top_k} neighbor table")
+        embeddings = load_embeddings(self.config.embeddings_path)
+        source_digest = read_embeddings_digest(self.config.embeddings_path)
+        logger.info(f"Loaded embeddings with shape: {embeddings.shape}")
+
+        with timed_step("compute neighbors"):
+            table = self.compute(embeddings)
+
+        indices_path = os.path.join(self.config.root_dir, NEIGHBOR_INDICES_FILE)
+        scores_path = os.path.join(self.config.root_dir, NEIGHBOR_SCORES_FILE)
+        with timed_step("save table"):
+            # Replaced rather than rewritten, since running servers map both files
+            save_array(table.indices, indices_path)
+            save_array(table.scores, scores_path)
+            source_path = os.path.join(self.config.root_dir, NEIGHBOR_SOURCE_FILE)
+            with open(source_path + ".tmp", "w") as f:
+                json.dump({"embeddings_digest": source_digest}, f)
+            os.replace(source_path + ".tmp", source_path)
+        logger.info(f"Neighbor table saved to: {indices_path}, {scores_path}")
+        logger.info("Neighbor table build completed successfully")
@@ -4,6 +4,8 @@ from src.movieRecommendation.entity import (
     DataTransformationConfig,
     DataPreparationConfig,
     ModelTrainerConfig,
+    ANNIndexConfig,
+    NeighborTableConfig,
 )
 from src.movieRecommendation.utils.common import read_yaml, create_directories
 from pathlib import Path
@@ -17,38 +19,87 @@ class ConfigurationManager:
 
     def get_data_ingestion_config(self) -> DataIngestionConfig:
         config = self.config.data_ingestion
+        params = self.params.streaming
         create_directories([config.root_dir])
         data_ingestion_config = DataIngestionConfig(
             root_dir=config.root_dir,
             drive_file_id=config.drive_file_id,
             local_data_file=config.local_data_file,
             unzip_dir=config.unzip_dir,
+            streaming=params.enabled,
+            stream_chunk_size=params.chunk_size,
         )
         return data_ingestion_config
 
     def get_data_transformation_config(self) -> DataTransformationConfig:
         config = self.config.data_transformation
+        params = self.params.streaming
         create_directories([config.root_dir])
         data_transformation_config = DataTransformationConfig(
-            root_dir=config.root_dir, data_path=config.data_path
+            root_dir=config.root_dir,
+            data_path=config.data_path,
+            streaming=params.enabled,
+            stream_chunk_size=params.chunk_size,
         )
         return data_transformation_config
 
     def get_data_preparation_config(self) -> DataPreparationConfig:
         config = self.config.data_preparation
+        params = self.params.data_preparation
         create_directories([config.root_dir])
         data_preparation_config = DataPreparationConfig(
-            root_dir=config.root_dir, data_path=config.data_path
+            root_dir=config.root_dir,
+            data_path=config.data_path,
+            n_workers=params.n_workers,
+            chunk_size=params.chunk_size,
+            streaming=self.params.streaming.enabled,
+            stream_chunk_size=self.params.streaming.chunk_size,
         )
         return data_preparation_config
 
     def get_model_trainer_config(self) -> ModelTrainerConfig:
         config = self.config.model_trainer
+        params = self.params.model_trainer
         create_directories([config.root_dir])
         model_trainer_config = ModelTrainerConfig(
             root_dir=Path(config.root_dir),
             data_path=Path(config.data_path),
             model_name=config.model_name,
             model_path=Path(config.model_path),
+            embedding_store_dir=Path(config.embedding_store_dir),
+            checkpoint_dir=Path(config.checkpoint_dir),
+            batch_size=params.batch_size,
+            checkpoint_every=params.checkpoint_every,
         )
         return model_trainer_config
+
+    def get_ann_index_config(self) -> ANNIndexConfig:
+        config = self.config.ann_index
+        params = self.params.ann_index
+        create_directories([config.root_dir])
+        ann_index_config = ANNIndexConfig(
+            root_dir=Path(config.root_dir),
+            embeddings_path=Path(config.embeddings_path),
+            backend=params.backend,
+            n_lists=params.n_lists,
+            n_iter=params.n_iter,
+            train_sample=params.train_sample,
+            seed=params.seed,
+            report_k=params.report_k,
+            report_queries=params.report_queries,
+            report_n_probe=list(params.report_n_probe),
+        )
+        return ann_index_config
+
+    def get_neighbor_table_config(self) -> NeighborTableConfig:
+        config = self.config.neighbor_table
+        params = self.params.neighbor_table
+        create_directories([config.root_dir])
+        neighbor_table_config = NeighborTableConfig(
+            root_dir=Path(config.root_dir),
+            embeddings_path=Path(config.embeddings_path),
+            top_k=params.top_k,
+            row_block_size=params.row_block_size,
+            column_chunk_size=params.column_chunk_size,
+        )
+        return neighbor_table_config
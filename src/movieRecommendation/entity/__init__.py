@@ -8,18 +8,26 @@ class DataIngestionConfig:
     drive_file_id: str
     local_data_file: str
     unzip_dir: str
+    streaming: bool
+    stream_chunk_size: int
 
 
 @dataclass
 class DataTransformationConfig:
     root_dir: Path
     data_path: Path
+    streaming: bool
+    stream_chunk_size: int
 
 
 @dataclass
 class DataPreparationConfig:
     root_dir: Path
     data_path: Path
+    n_workers: int
+    chunk_size: int
+    streaming: bool
+    stream_chunk_size: int
 
 
 @dataclass
@@ -28,3 +36,30 @@ class ModelTrainerConfig:
     data_path: Path
     model_name: str
     model_path: Path
+    embedding_store_dir: Path
+    checkpoint_dir: Path
+    batch_size: int
+    checkpoint_every: int
+
+
+@dataclass
+class ANNIndexConfig:
+    root_dir: Path
+    embeddings_path: Path
+    backend: str
+    n_lists: int
+    n_iter: int
+    train_sample: int
+    seed: int
+    report_k: int
+    report_queries: int
+    report_n_probe: list
+
+
+@dataclass
+class NeighborTableConfig:
+    root_dir: Path
+    embeddings_path: Path
+    top_k: int
+    row_block_size: int
+    column_chunk_size: int
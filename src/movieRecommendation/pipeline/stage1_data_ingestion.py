@@ -1,6 +1,7 @@
 from src.movieRecommendation.config.configuration import ConfigurationManager
 from src.movieRecommendation.components.data_ingestion import DataIngestion
 from src.movieRecommendation.logging import logger
+from src.movieRecommendation.utils.profiling import timed_step
 
 
 class DataIngestionPipeline:
@@ -12,8 +13,16 @@ class DataIngestionPipeline:
             config = ConfigurationManager()
             data_ingestion_config = config.get_data_ingestion_config()
             data_ingestion = DataIngestion(config=data_ingestion_config)
-            data_ingestion.download_data()
-            data_ingestion.extract_zip_file()
+            with timed_step("download data"):
+                data_ingestion.download_data()
+            if data_ingestion_config.streaming:
+                with timed_step("stream to parquet"):
+                    data_ingestion.stream_to_parquet()
+            else:
+                with timed_step("extract zip"):
+                    data_ingestion.extract_zip_file()
+                with timed_step("convert to parquet"):
+                    data_ingestion.convert_to_parquet()
         except Exception as e:
             logger.exception(e)
             raise e
@@ -0,0 +1,18 @@
+from src.movieRecommendation.config.configuration import ConfigurationManager
+from src.movieRecommendation.components.ann_index import ANNIndexBuilder
+from src.movieRecommendation.logging import logger
+
+
+class ANNIndexPipeline:
+    def __init__(self):
+        pass
+
+    def initiate_ann_index(self):
+        try:
+            config = ConfigurationManager()
+            ann_index_config = config.get_ann_index_config()
+            ann_index_builder = ANNIndexBuilder(config=ann_index_config)
+            ann_index_builder.build()
+        except Exception as e:
+            logger.exception(e)
+            raise e
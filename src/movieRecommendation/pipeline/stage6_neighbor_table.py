@@ -0,0 +1,18 @@
+from src.movieRecommendation.config.configuration import ConfigurationManager
+from src.movieRecommendation.components.neighbor_table import NeighborTableBuilder
+from src.movieRecommendation.logging import logger
+
+
+class NeighborTablePipeline:
+    def __init__(self):
+        pass
+
+    def initiate_neighbor_table(self):
+        try:
+            config = ConfigurationManager()
+            neighbor_table_config = config.get_neighbor_table_config()
+            neighbor_table_builder = NeighborTableBuilder(config=neighbor_table_config)
+            neighbor_table_builder.build()
+        except Exception as e:
+            logger.exception(e)
+            raise e
@@ -0,0 +1,118 @@
+import os
+import hashlib
+import numpy as np
+
+STORE_KEYS_FILE = "keys.npy"
+STORE_VECTORS_FILE = "vectors.npy"
+
+
+def content_key(model_name, text):
+    """Returns the store key for one text embedded by one model.
+
+    Args:
+        model_name (str): Name of the embedding model.
+        text (str): The text that is embedded.
+
+    Returns:
+        bytes: The 32-byte SHA-256 digest of the model name and text.
+    """
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).digest()
+
+
+class EmbeddingStore:
+    """Content-addressed embedding vectors, keyed by content_key.
+
+    The store lives in a directory as two aligned arrays: the fixed-width
+    keys and the float32 vectors.
+
+    Args:
+        keys (np.ndarray): A 1D array of 32-byte keys.
+        vectors (np.ndarray | None): A 2D array with one vector per key.
+    """
+
+    def __init__(self, keys=None, vectors=None):
+        keys = np.empty(0, dtype="S32") if keys is None else keys
+        self.vectors = vectors
+        self._rows = {key: row for row, key in enumerate(keys.tolist())}
+
+    def __len__(self):
+        return len(self._rows)
+
+    @classmethod
+    def load(cls, store_dir):
+        """Loads a saved store, or returns an empty one if there is none."""
+        keys_path = os.path.join(store_dir, STORE_KEYS_FILE)
+        vectors_path = os.path.join(store_dir, STORE_VECTORS_FILE)
+        if not (os.path.exists(keys_path) and os.path.exists(vectors_path)):
+            return cls()
+        return cls(np.load(keys_path), np.load(vectors_path))
+
+    def lookup(self, keys):
+        """Returns the stored rows for keys, with -1 for keys not in the store."""
+        return np.array([self._rows.get(key, -1) for key in keys], dtype=np.intp)
+
+    def assemble(self, keys, embed_fn):
+        """Returns one vector per key, embedding only keys missing from the store.
+
+        Args:
+            keys (list[bytes]): Keys of the rows to return, in order.
+            embed_fn (Callable[[list[int]], np.ndarray]): Embeds the rows at the
+                given positions in keys, returning one vector per position.
+
+        Returns:
+            tuple[np.ndarray, int]: The float32 matrix aligned with keys and the
+                number of rows that were embedded.
+        """
+        rows = self.lookup(keys)
+        hits = rows >= 0
+        # Duplicate texts share a key, so each missing key is embedded once
+        missing = {}
+        for position, key in enumerate(keys):
+            if not hits[position] and key not in missing:
+                missing[key] = position
+        new_vectors = None
+        if missing:
+            new_vectors = np.asarray(embed_fn(list(missing.values())), dtype=np.float32)
+            if hits.any() and new_vectors.shape[1] != self.vectors.shape[1]:
+                # The stored vectors have another width and cannot be mixed in,
+                # so the rows that hit are embedded afresh as well
+                stale = {}
+                for position in np.flatnonzero(hits):
+                    stale.setdefault(keys[position], position)
+                new_vectors = np.concatenate(
+                    [new_vectors, np.asarray(embed_fn(list(stale.values())), dtype=np.float32)]
+                )
+                missing.update(stale)
+                hits[:] = False
+
+        if new_vectors is not None:
+            dim = new_vectors.shape[1]
+        elif self.vectors is not None:
+            dim = self.vectors.shape[1]
+        else:
+            dim = 0
+        matrix = np.empty((len(keys), dim), dtype=np.float32)
+        if hits.any():
+            matrix[hits] = self.vectors[rows[hits]]
+        if missing:
+            new_rows = {key: i for i, key in enumerate(missing)}
+            for position in np.flatnonzero(~hits):
+                matrix[position] = new_vectors[new_rows[keys[position]]]
+        return matrix, len(missing)
+
+    @staticmethod
+    def save(store_dir, keys, vectors):
+        """Saves the given keys and vectors as the store, dropping stale entries.
+
+        Args:
+            store_dir (str | Path): Directory holding the store files.
+            keys (list[bytes]): Keys of the current rows; duplicates are kept once.
+            vectors (np.ndarray): The matrix aligned with keys.
+        """
+        os.makedirs(store_dir, exist_ok=True)
+        unique_keys, first_rows = np.unique(np.array(keys, dtype="S32"), return_index=True)
+        np.save(os.path.join(store_dir, STORE_KEYS_FILE), unique_keys)
+        np.save(
+            os.path.join(store_dir, STORE_VECTORS_FILE),
+            np.ascontiguousarray(vectors[first_rows], dtype=np.float32),
+        )
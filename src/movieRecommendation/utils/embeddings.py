@@ -0,0 +1,159 @@
+import os
+import pickle
+import hashlib
+import numpy as np
+
+# Rows hashed per update when fingerprinting an embeddings matrix
+DIGEST_BLOCK_ROWS = 65536
+
+
+def normalize_embeddings(embeddings):
+    """Returns a contiguous float32 copy of the embeddings with unit-length rows.
+
+    Args:
+        embeddings (np.ndarray): A 2D array of embedding vectors.
+
+    Returns:
+        np.ndarray: The row-normalized float32 matrix.
+    """
+    matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    # Leave zero vectors as-is so they score 0 against everything
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_indices(scores, k):
+    """Returns the indices of the k highest scores in descending order.
+
+    Args:
+        scores (np.ndarray): A 1D array of scores.
+        k (int): The number of indices to return.
+
+    Returns:
+        np.ndarray: Up to k indices into scores, best first.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def resolve_embeddings_path(path):
+    """Returns the embeddings artifact to load, preferring the .npy file.
+
+    Older pipeline runs pickled the embeddings, so a .pkl file next to the
+    requested .npy path is used as a fallback.
+
+    Args:
+        path (str | Path): Path to the .npy embeddings artifact.
+
+    Returns:
+        str | None: The existing artifact path, or None if neither exists.
+    """
+    path = str(path)
+    if os.path.exists(path):
+        return path
+    legacy_path = os.path.splitext(path)[0] + ".pkl"
+    if os.path.exists(legacy_path):
+        return legacy_path
+    return None
+
+
+def save_array(array, path):
+    """Saves an array as a .npy file without rewriting the old file in place.
+
+    Running servers memory-map these artifacts, and overwriting a mapped file
+    changes (or, when it shrinks, invalidates) the pages they read. Writing a
+    temporary file and renaming it over path leaves old mappings on the old
+    file until they are dropped.
+
+    Args:
+        array (np.ndarray): The array to save.
+        path (str | Path): Destination .npy path.
+    """
+    path = str(path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def digest_path(path):
+    """Returns the path of the digest file kept next to an embeddings artifact."""
+    return os.path.splitext(str(path))[0] + ".sha256"
+
+
+def embeddings_digest(embeddings):
+    """Returns the SHA-256 hex digest of a float32 matrix's shape and values.
+
+    Args:
+        embeddings (np.ndarray): The matrix, possibly memory-mapped.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256(repr(embeddings.shape).encode("utf-8"))
+    for start in range(0, len(embeddings), DIGEST_BLOCK_ROWS):
+        block = embeddings[start : start + DIGEST_BLOCK_ROWS]
+        digest.update(np.ascontiguousarray(block, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+def write_embeddings_digest(embeddings, path):
+    """Records the digest of the embeddings saved at path in its digest file."""
+    tmp_path = digest_path(path) + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(embeddings_digest(embeddings))
+    os.replace(tmp_path, digest_path(path))
+
+
+def read_embeddings_digest(path):
+    """Returns the recorded digest of the embeddings at path, or None if there is none."""
+    try:
+        with open(digest_path(path)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def save_embeddings(embeddings, path):
+    """Saves embeddings as a row-normalized float32 .npy file with its digest.
+
+    Artifacts derived from the embeddings record this digest so that serving
+    can tell when they were built from other vectors. The digest is written
+    first, so a failed save leaves a digest that matches no derived artifact.
+
+    Args:
+        embeddings (np.ndarray): A 2D array of embedding vectors.
+        path (str | Path): Destination .npy path.
+    """
+    normalized = normalize_embeddings(embeddings)
+    write_embeddings_digest(normalized, path)
+    save_array(normalized, path)
+
+
+def load_embeddings(path):
+    """Loads row-normalized float32 embeddings.
+
+    A .npy artifact is memory-mapped read-only, so worker processes share
+    the page cache instead of each holding a private copy. A legacy pickle
+    artifact is read fully and normalized.
+
+    Args:
+        path (str | Path): Path to the .npy embeddings artifact.
+
+    Returns:
+        np.ndarray: The row-normalized float32 matrix.
+    """
+    resolved = resolve_embeddings_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"No embeddings found at {path}")
+    if resolved.endswith(".npy"):
+        return np.asarray(np.load(resolved, mmap_mode="r"))
+    with open(resolved, "rb") as f:
+        return normalize_embeddings(pickle.load(f))
@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import time
+import cProfile
+from contextlib import contextmanager
+from src.movieRecommendation.logging import logger
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Step totals of the stage currently running under RunProfiler.stage
+_active_steps = None
+# Peak RSS in kB of every open stage and step, innermost last; None where unknown
+_open_peaks = []
+# Highest VmHWM read before a reset, which also lowers ru_maxrss on Linux
+_reset_peak_kb = 0
+
+
+def peak_rss_mb():
+    """Returns the process's peak resident set size so far in MiB, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    peak_kb = peak / (1024 if sys.platform == "darwin" else 1)
+    return round(max(peak_kb, _reset_peak_kb) / 1024, 1)
+
+
+def _read_status_kb(field):
+    """Returns a kB field of /proc/self/status such as VmRSS, or None off Linux"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _fold_peak():
+    global _reset_peak_kb
+    # VmHWM holds the peak since the last reset, which every open region has seen
+    high_water = _read_status_kb("VmHWM")
+    if high_water is not None:
+        _reset_peak_kb = max(_reset_peak_kb, high_water)
+        for i, peak in enumerate(_open_peaks):
+            if peak is not None:
+                _open_peaks[i] = max(peak, high_water)
+
+
+def _begin_peak():
+    """Starts measuring the peak RSS of a region by resetting the kernel's high-water mark.
+
+    ru_maxrss only ever grows, so it cannot tell which stage or step reached
+    the peak. Writing 5 to clear_refs resets VmHWM to the current RSS instead;
+    the peak reached so far is first folded into the regions still open.
+    """
+    _fold_peak()
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        start = _read_status_kb("VmRSS")
+    except OSError:
+        start = None
+    _open_peaks.append(start)
+
+
+def _end_peak():
+    """Returns the peak RSS in MiB of the innermost region, or None if it cannot be isolated"""
+    _fold_peak()
+    peak = _open_peaks.pop()
+    return None if peak is None else round(peak / 1024, 1)
+
+
+def _snapshot():
+    child_cpu = 0.0
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        child_cpu = usage.ru_utime + usage.ru_stime
+    return time.perf_counter(), time.process_time(), child_cpu
+
+
+def _elapsed(start):
+    wall, cpu, child_cpu = (end - begin for end, begin in zip(_snapshot(), start))
+    return {
+        "wall_seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        # CPU of finished worker processes, e.g. the description cleaning pool
+        "child_cpu_seconds": round(child_cpu, 4),
+    }
+
+
+@contextmanager
+def timed_step(name):
+    """Logs the wall and CPU time of a block and adds it to the running stage's report.
+
+    Steps that run several times in one stage, e.g. once per streamed chunk,
+    are summed under their name.
+
+    Args:
+        name (str): The step name used in the log and the run report.
+    """
+    _begin_peak()
+    start = _snapshot()
+    try:
+        yield
+    finally:
+        metrics = _elapsed(start)
+        metrics["peak_rss_mb"] = _end_peak()
+        logger.info(
+            f"Step '{name}' took {metrics['wall_seconds']:.2f}s wall, "
+            f"{metrics['cpu_seconds'] + metrics['child_cpu_seconds']:.2f}s CPU, "
+            f"peak RSS {metrics['peak_rss_mb']} MiB"
+        )
+        if _active_steps is not None:
+            totals = _active_steps.setdefault(
+                name,
+                {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "child_cpu_seconds": 0.0},
+            )
+            totals["calls"] += 1
+            for key in ("wall_seconds", "cpu_seconds", "child_cpu_seconds"):
+                totals[key] = round(totals[key] + metrics[key], 4)
+            if metrics["peak_rss_mb"] is not None:
+                previous = totals.get("peak_rss_mb") or 0
+                totals["peak_rss_mb"] = max(previous, metrics["peak_rss_mb"])
+
+
+class RunProfiler:
+    """Times every pipeline stage and writes a JSON run report.
+
+    Each stage records wall time, CPU time of this process and of finished
+    child processes, the peak RSS reached while it ran and its timed steps
+    (measured on Linux only, None elsewhere). The report is rewritten after
+    every stage, so a failed run still leaves one behind. It is saved as
+    <report_dir>/<run_id>.json and copied to latest.json. With profile=True each stage also runs under
+    cProfile and its stats are dumped to <report_dir>/<run_id>/<stage>.prof.
+
+    Args:
+        report_dir (str | Path): Directory for run reports and profiles.
+        profile (bool): Whether to run stages under cProfile.
+    """
+
+    def __init__(self, report_dir, profile=False):
+        self.report_dir = str(report_dir)
+        self.profile = profile
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self.report = {
+            "run_id": self.run_id,
+            "started_at": time.time(),
+            "finished_at": None,
+            "profiled": profile,
+            "stages": [],
+        }
+        self._start = _snapshot()
+        os.makedirs(self.report_dir, exist_ok=True)
+
+    @contextmanager
+    def stage(self, key, name):
+        """Measures the stage run inside the with block"""
+        global _active_steps
+        record = {"key": key, "name": name, "status": "running", "steps": {}}
+        self.report["stages"].append(record)
+        _active_steps = record["steps"]
+        profiler = cProfile.Profile() if self.profile else None
+        _begin_peak()
+        start = _snapshot()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+            record["status"] = "completed"
+        except BaseException:
+            record["status"] = "failed"
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profile_dir = os.path.join(self.report_dir, self.run_id)
+                os.makedirs(profile_dir, exist_ok=True)
+                record["profile_path"] = os.path.join(profile_dir, f"{key}.prof")
+                profiler.dump_stats(record["profile_path"])
+            _active_steps = None
+            record.update(_elapsed(start))
+            record["peak_rss_mb"] = _end_peak()
+            logger.info(
+                f"Stage {name} took {record['wall_seconds']:.2f}s wall, "
+                f"{record['cpu_seconds'] + record['child_cpu_seconds']:.2f}s CPU, "
+                f"peak RSS {record['peak_rss_mb']} MiB"
+            )
+            self.save()
+
+    def skip(self, key, name):
+        """Records a stage that was not run"""
+        self.report["stages"].append({"key": key, "name": name, "status": "skipped"})
+        self.save()
+
+    def save(self):
+        self.report["finished_at"] = time.time()
+        self.report["total"] = _elapsed(self._start)
+        # The whole run's peak is the process high-water mark
+        self.report["total"]["peak_rss_mb"] = peak_rss_mb()
+        encoded = json.dumps(self.report, indent=2)
+        for file_name in (f"{self.run_id}.json", "latest.json"):
+            with open(os.path.join(self.report_dir, file_name), "w") as f:
+                f.write(encoded)
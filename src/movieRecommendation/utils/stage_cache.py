@@ -0,0 +1,80 @@
+import os
+import json
+import hashlib
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def hash_file(path):
+    """Returns the SHA-256 hex digest of a file's contents, or None if it is missing.
+
+    Args:
+        path (str | Path): The file to hash.
+
+    Returns:
+        str | None: The hex digest.
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_fingerprint(settings, input_paths, code_paths):
+    """Returns a fingerprint of everything a stage's outputs depend on.
+
+    Args:
+        settings (dict): The stage's config and params sections.
+        input_paths (list[str | Path]): Artifacts the stage reads.
+        code_paths (list[str | Path]): Source files that implement the stage.
+
+    Returns:
+        str: A hex digest that changes whenever any of them changes.
+    """
+    payload = {
+        "settings": settings,
+        "inputs": {str(path): hash_file(path) for path in input_paths},
+        "code": {str(path): hash_file(path) for path in code_paths},
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class StageCache:
+    """Fingerprints of the last successful run of each pipeline stage, kept in a JSON file.
+
+    Args:
+        path (str | Path): The JSON file holding the fingerprints.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._fingerprints = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self._fingerprints = json.load(f)
+
+    def is_up_to_date(self, stage, fingerprint, output_paths):
+        """Returns True if the stage last ran with this fingerprint and its outputs exist."""
+        return self._fingerprints.get(stage) == fingerprint and all(
+            os.path.exists(path) for path in output_paths
+        )
+
+    def record(self, stage, fingerprint):
+        """Stores the fingerprint of a successful stage run."""
+        self._fingerprints[stage] = fingerprint
+        self._save()
+
+    def invalidate(self, stage):
+        """Forgets a stage's fingerprint so its next run is never skipped."""
+        if self._fingerprints.pop(stage, None) is not None:
+            self._save()
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._fingerprints, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,174 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def resolve_table_path(path):
+    """Returns the table artifact to load, preferring the .parquet file.
+
+    Older pipeline runs wrote CSV, so a .csv file next to the requested
+    .parquet path is used as a fallback.
+
+    Args:
+        path (str | Path): Path to the .parquet table artifact.
+
+    Returns:
+        str | None: The existing artifact path, or None if neither exists.
+    """
+    path = str(path)
+    if os.path.exists(path):
+        return path
+    legacy_path = os.path.splitext(path)[0] + ".csv"
+    if os.path.exists(legacy_path):
+        return legacy_path
+    return None
+
+
+def read_table(path, columns=None):
+    """Reads a table artifact, loading only the requested columns.
+
+    Args:
+        path (str | Path): Path to the .parquet table artifact.
+        columns (list[str] | None): Columns to load; None loads all of them.
+
+    Returns:
+        pd.DataFrame: The loaded table.
+    """
+    resolved = resolve_table_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"No table found at {path}")
+    if resolved.endswith(".parquet"):
+        return pd.read_parquet(resolved, columns=columns)
+    return pd.read_csv(resolved, usecols=columns)
+
+
+def table_columns(path):
+    """Returns the column names of a table artifact without reading its rows.
+
+    Args:
+        path (str | Path): Path to the .parquet table artifact.
+
+    Returns:
+        list[str]: The column names.
+    """
+    resolved = resolve_table_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"No table found at {path}")
+    if resolved.endswith(".parquet"):
+        return pq.read_schema(resolved).names
+    return pd.read_csv(resolved, nrows=0).columns.tolist()
+
+
+def write_table(df, path):
+    """Writes a dataframe as a Parquet table artifact without its index.
+
+    Args:
+        df (pd.DataFrame): The table to write.
+        path (str | Path): Destination .parquet path.
+    """
+    df.to_parquet(path, index=False)
+
+
+def iter_table_chunks(path, chunk_size, columns=None):
+    """Yields a table artifact as dataframes of at most chunk_size rows.
+
+    Only one chunk is held in memory at a time.
+
+    Args:
+        path (str | Path): Path to the .parquet table artifact.
+        chunk_size (int): Maximum number of rows per chunk.
+        columns (list[str] | None): Columns to load; None loads all of them.
+
+    Yields:
+        pd.DataFrame: The next chunk of rows.
+    """
+    resolved = resolve_table_path(path)
+    if resolved is None:
+        raise FileNotFoundError(f"No table found at {path}")
+    if resolved.endswith(".parquet"):
+        for batch in pq.ParquetFile(resolved).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(resolved, usecols=columns, chunksize=chunk_size)
+
+
+def infer_csv_dtypes(chunks):
+    """Returns one dtype per column that holds the values of every CSV chunk.
+
+    pandas infers dtypes per chunk, so a column can be integer in one chunk
+    and float or text in another. Integers widen to floats when any chunk
+    has missing values or floats, anything mixed with text is read as
+    strings, and columns that are missing throughout are strings too.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): The chunks of one CSV file.
+
+    Returns:
+        dict[str, str]: Column name to a dtype accepted by pd.read_csv.
+    """
+    kinds, has_missing = {}, {}
+    for chunk in chunks:
+        for name in chunk.columns:
+            column = chunk[name]
+            kinds.setdefault(name, set())
+            has_missing[name] = has_missing.get(name, False) or bool(column.isna().any())
+            if column.notna().any():
+                kinds[name].add(column.dtype.kind)
+    dtypes = {}
+    for name, seen in kinds.items():
+        if seen == {"i"} and not has_missing[name]:
+            dtypes[name] = "int64"
+        elif seen == {"b"} and not has_missing[name]:
+            dtypes[name] = "bool"
+        elif seen and seen <= {"i", "f"}:
+            dtypes[name] = "float64"
+        else:
+            dtypes[name] = "str"
+    return dtypes
+
+
+class ParquetChunkWriter:
+    """Appends dataframes to one Parquet file, one row group per chunk.
+
+    The first chunk fixes the schema and later chunks are cast to it, so
+    chunks must agree on their dtypes. Text columns that are entirely
+    missing in the first chunk are typed as strings, since pyarrow would
+    otherwise infer a null column.
+
+    Args:
+        path (str | Path): Destination .parquet path.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.schema = None
+        self.n_rows = 0
+        self._writer = None
+
+    def write(self, df):
+        """Appends the rows of df to the file."""
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            fields = [
+                pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                for field in table.schema
+            ]
+            self.schema = pa.schema(fields)
+            self._writer = pq.ParquetWriter(self.path, self.schema)
+        table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        self._writer.write_table(table)
+        self.n_rows += len(df)
+
+    def close(self):
+        """Finishes the file, writing an empty table if no chunk was written."""
+        if self._writer is None:
+            pd.DataFrame().to_parquet(self.path, index=False)
+        else:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
@@ -0,0 +1,224 @@
+import sys
+from bisect import bisect_left
+import numpy as np
+from src.movieRecommendation.utils.embeddings import top_k_indices
+
+# Posting entries pack the trigram into the high and the title id into the low 32 bits
+TITLE_ID_BITS = np.uint64(32)
+BITMAP_DENSITY = 32
+
+
+def trigrams(text):
+    """Returns the set of character trigrams of a padded, lowercased string.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        set[str]: Trigrams, including word-boundary ones such as "  t" and "he ".
+    """
+    padded = f"  {text.lower()} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _code_points(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def _first_in_run(sorted_values):
+    """Marks the first element of every run of equal values in a sorted array"""
+    first = np.ones(len(sorted_values), dtype=bool)
+    first[1:] = sorted_values[1:] != sorted_values[:-1]
+    return first
+
+
+class TitleSearchIndex:
+    """Prefix and typo-tolerant lookup over movie titles.
+
+    Prefix matches come from two bisects over the lowercased, sorted titles.
+    Fuzzy matches rank titles by trigram Jaccard similarity using an inverted
+    index from trigram to title ids, so a query only touches titles sharing
+    at least one trigram with it. The index is built with NumPy: trigrams are
+    encoded as integers over the catalog's alphabet and the (trigram, title)
+    pairs are sorted once into CSR posting lists.
+
+    Args:
+        keys (list[str]): Lowercased titles, sorted.
+        titles (list[str]): Original titles aligned with keys.
+        max_postings (int): Trigrams shared by more titles than this do not
+            add candidates when rarer ones are available, bounding per-query
+            work; they still count towards each candidate's score.
+        max_candidates (int): Most candidates scored per query, keeping those
+            that could reach the highest scores; results are exact whenever no
+            dropped candidate could have beaten them.
+    """
+
+    def __init__(self, keys, titles, max_postings=2500, max_candidates=512):
+        self.keys = keys
+        self.titles = titles
+        self.max_postings = max_postings
+        self.max_candidates = max_candidates
+
+        padded = [f"  {key.lower()} " for key in keys]
+        lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+        chars = _code_points("".join(padded))
+        del padded
+        # A lookup table from code point to alphabet rank keeps every per-character array at 32 bits
+        rank_of = np.zeros(int(chars.max()) + 1 if len(chars) else 0, dtype=np.uint32)
+        rank_of[chars] = 1
+        self.alphabet = np.flatnonzero(rank_of).astype(np.uint32)
+        rank_of[self.alphabet] = np.arange(len(self.alphabet), dtype=np.uint32)
+        ranks = rank_of[chars]
+        del chars, rank_of
+        dense = len(self.alphabet) ** 3 > 2**32
+        if dense:
+            ranks = ranks.astype(np.uint64)
+        codes = self._encode(ranks[:-2], ranks[1:-1], ranks[2:])
+        del ranks
+
+        # Only trigrams that stay inside one padded title are indexed
+        inside = np.ones(len(codes), dtype=bool)
+        ends = np.cumsum(lengths)[:-1]
+        inside[ends - 2] = False
+        inside[ends - 1] = False
+        codes = codes[inside]
+        del inside, ends
+        if dense:
+            # Too many distinct characters for 32-bit codes, so number the trigrams densely
+            self.gram_codes, codes = np.unique(codes, return_inverse=True)
+
+        # One in-place sort orders the pairs by trigram, then title, and exposes duplicates
+        pairs = codes.astype(np.uint64)
+        del codes
+        pairs <<= TITLE_ID_BITS
+        pairs |= np.repeat(np.arange(len(keys), dtype=np.uint32), lengths - 2)
+        pairs.sort()
+        unique = _first_in_run(pairs)
+        # Each pair viewed as two 32-bit halves, the title id being the low one
+        halves = pairs.view(np.uint32).reshape(-1, 2)
+        low = 0 if sys.byteorder == "little" else 1
+        grams = halves[:, 1 - low]
+        # The first pair of a trigram is never a duplicate, so it marks its list start
+        first_of_gram = _first_in_run(grams)
+        if not dense:
+            self.gram_codes = grams[first_of_gram]
+        list_starts = np.flatnonzero(first_of_gram[unique])
+        del grams, first_of_gram
+        self.posting_ids = halves[:, low][unique].view(np.int32)
+        del pairs, halves, unique
+        self.offsets = np.append(list_starts, len(self.posting_ids))
+        self.gram_counts = np.bincount(self.posting_ids, minlength=len(keys)).astype(np.int32)
+
+        # Trigrams in more than one title out of BITMAP_DENSITY also get a bitmap, which
+        # is no larger than their posting list and answers membership with one lookup
+        dense_rows = np.flatnonzero(np.diff(self.offsets) * BITMAP_DENSITY > len(keys))
+        self.bitmap_of = np.full(len(self.gram_codes), -1, dtype=np.int32)
+        self.bitmap_of[dense_rows] = np.arange(len(dense_rows), dtype=np.int32)
+        self.bitmaps = np.zeros((len(dense_rows), (len(keys) + 7) // 8), dtype=np.uint8)
+        members = np.zeros(len(keys), dtype=bool)
+        for bitmap, row in zip(self.bitmaps, dense_rows):
+            ids = self.posting_ids[self.offsets[row] : self.offsets[row + 1]]
+            members[ids] = True
+            bitmap[:] = np.packbits(members, bitorder="little")
+            members[ids] = False
+
+    def _encode(self, first, second, third):
+        size = first.dtype.type(len(self.alphabet))
+        codes = first * size
+        codes += second
+        codes *= size
+        codes += third
+        return codes
+
+    def _rows(self, text):
+        """Returns the index rows of the distinct trigrams in text that are indexed."""
+        if not len(self.gram_codes):
+            return np.empty(0, dtype=np.intp)
+        chars = _code_points(text)
+        ranks = np.minimum(np.searchsorted(self.alphabet, chars), len(self.alphabet) - 1)
+        # Trigrams with a character the catalog never uses cannot be indexed
+        known = self.alphabet[ranks] == chars
+        present = known[:-2] & known[1:-1] & known[2:]
+        ranks = ranks.astype(self.gram_codes.dtype)
+        codes = np.unique(self._encode(ranks[:-2], ranks[1:-1], ranks[2:])[present])
+        rows = np.minimum(np.searchsorted(self.gram_codes, codes), len(self.gram_codes) - 1)
+        return rows[self.gram_codes[rows] == codes]
+
+    def _postings(self, row):
+        return self.posting_ids[self.offsets[row] : self.offsets[row + 1]]
+
+    def postings(self, gram):
+        """Returns the sorted ids of the titles containing one trigram."""
+        rows = self._rows(gram)
+        return self._postings(rows[0]) if len(rows) else np.empty(0, dtype=np.int32)
+
+    def prefix(self, query, limit=10):
+        """Returns up to limit title ids whose lowercased title starts with query."""
+        key = query.lower()
+        start = bisect_left(self.keys, key)
+        end = bisect_left(self.keys, key + "\U0010ffff", lo=start)
+        return list(range(start, min(end, start + limit)))
+
+    def fuzzy(self, query, limit=10, min_score=0.3):
+        """Returns up to limit (title id, score) pairs ranked by trigram similarity."""
+        n_grams = len(trigrams(query))
+        rows = self._rows(f"  {query.lower()} ")
+        if not len(rows):
+            return []
+        sizes = self.offsets[rows + 1] - self.offsets[rows]
+        order = np.argsort(sizes, kind="stable")
+        rows, sizes = rows[order], sizes[order]
+        # Rare trigrams pick the candidates; common ones only add to their overlap
+        n_rare = max(int(np.searchsorted(sizes, self.max_postings, side="right")), 1)
+        if n_rare == 1:
+            candidates = self._postings(rows[0])
+            shared = np.ones(len(candidates), dtype=np.int64)
+        else:
+            candidates, shared = np.unique(
+                np.concatenate([self._postings(row) for row in rows[:n_rare]]), return_counts=True
+            )
+        common = rows[n_rare:]
+        counts = self.gram_counts[candidates]
+        # Highest score each candidate could reach if it holds every common trigram
+        reachable = np.minimum(shared + len(common), counts)
+        bounds = reachable / (n_grams + counts - reachable)
+        chosen = np.flatnonzero(bounds >= min_score)
+        if len(chosen) > self.max_candidates:
+            chosen = chosen[np.argpartition(-bounds[chosen], self.max_candidates - 1)[: self.max_candidates]]
+            # Ascending ids let each binary search below start where the last one ended
+            chosen.sort()
+        candidates, shared, counts = candidates[chosen], shared[chosen], counts[chosen]
+        bitmaps = self.bitmap_of[common]
+        for row in common[bitmaps < 0]:
+            # Posting lists are sorted, so membership is a binary search per candidate
+            ids = self._postings(row)
+            positions = np.minimum(np.searchsorted(ids, candidates), len(ids) - 1)
+            shared = shared + (ids[positions] == candidates)
+        bitmaps = bitmaps[bitmaps >= 0]
+        if len(bitmaps):
+            held = self.bitmaps[bitmaps[:, None], candidates >> 3] >> (candidates & 7).astype(np.uint8)
+            shared = shared + (held & 1).sum(axis=0)
+        scores = shared / (n_grams + counts - shared)
+        best = top_k_indices(scores, limit)
+        return [
+            (int(candidates[i]), round(float(scores[i]), 3))
+            for i in best
+            if scores[i] >= min_score
+        ]
+
+    def search(self, query, limit=10):
+        """Returns prefix matches first, then fuzzy matches, as result dictionaries."""
+        results = [
+            {"title": self.titles[title_id], "score": 1.0, "match": "prefix"}
+            for title_id in self.prefix(query, limit)
+        ]
+        if len(results) < limit:
+            seen = {result["title"] for result in results}
+            for title_id, score in self.fuzzy(query, limit):
+                if len(results) == limit:
+                    break
+                if self.titles[title_id] not in seen:
+                    results.append(
+                        {"title": self.titles[title_id], "score": score, "match": "fuzzy"}
+                    )
+        return results
@@ -0,0 +1,505 @@
+import os
+import pytest
+import pandas as pd
+import numpy as np
+from unittest.mock import MagicMock
+import app
+from src.movieRecommendation.utils.embeddings import normalize_embeddings
+
+
+@pytest.fixture
+def movies_df():
+    return pd.DataFrame({
+        "title": ["Movie A", "Movie B", "Movie C", "movie a"],
+        "poster_path": ["/a", "/b", "/c", "/d"],
+    })
+
+
+@pytest.fixture
+def embeddings():
+    return normalize_embeddings(np.array([
+        [1.0, 0.0],
+        [0.9, 0.1],
+        [0.0, 1.0],
+        [0.5, 0.5],
+    ]))
+
+
+@pytest.fixture
+def loaded_app(monkeypatch, movies_df, embeddings):
+    serving_state = app.ServingState(movies_df, embeddings)
+    monkeypatch.setattr(app, "state", serving_state)
+    return serving_state
+
+
+def test_build_title_index_keeps_first_occurrence():
+    exact, lowered = app.build_title_index(["Up", "Heat", "up", float("nan"), "Heat"])
+    assert exact == {"Up": 0, "Heat": 1, "up": 2}
+    assert lowered == {"up": 0, "heat": 1}
+
+
+def test_normalize_embeddings_is_unit_float32():
+    normalized = normalize_embeddings(np.array([[3.0, 4.0], [0.0, 0.0]]))
+    assert normalized.dtype == np.float32
+    assert normalized.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(normalized, [[0.6, 0.8], [0.0, 0.0]], rtol=1e-6)
+
+
+def test_top_k_indices_matches_full_sort():
+    scores = np.random.default_rng(0).random(500).astype(np.float32)
+    expected = np.argsort(-scores)[:13]
+    np.testing.assert_array_equal(app.top_k_indices(scores, 13), expected)
+    assert len(app.top_k_indices(scores, 1000)) == 500
+
+
+def test_build_catalog_arrays_maps_missing_posters_to_none():
+    df = pd.DataFrame({"title": ["A", "B"], "poster_path": ["/a", np.nan]})
+    titles, posters = app.build_catalog_arrays(df)
+    assert titles.tolist() == ["A", "B"]
+    assert posters.tolist() == ["/a", None]
+    assert app.build_catalog_arrays(df[["title"]])[1] is None
+
+
+def test_find_movie_index_exact_and_case_insensitive(loaded_app):
+    assert app.find_movie_index("movie a", loaded_app) == 3
+    assert app.find_movie_index("MOVIE B", loaded_app) == 1
+    assert app.find_movie_index("Unknown", loaded_app) is None
+
+
+def test_content_based_recommend(loaded_app):
+    recommendations, error = app.content_based_recommend("Movie A", loaded_app, N=2)
+    assert error is None
+    assert [r["title"] for r in recommendations] == ["Movie B", "movie a"]
+    assert recommendations[0]["poster_path"] == "/b"
+
+    recommendations, error = app.content_based_recommend("Nope", loaded_app)
+    assert recommendations is None
+    assert "not found" in error
+
+
+def test_content_based_recommend_with_ann_index(movies_df, embeddings):
+    from src.movieRecommendation.components.ann_index import IVFFlatIndex
+
+    index = IVFFlatIndex.build(embeddings, n_lists=2)
+    serving_state = app.ServingState(movies_df, embeddings, ann_index=index)
+    recommendations, error = app.content_based_recommend("Movie A", serving_state, N=3)
+    assert error is None
+    assert "Movie A" not in [r["title"] for r in recommendations]
+
+
+def test_batch_recommend_matches_single_and_reports_errors(loaded_app):
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app.app)
+    response = client.post(
+        "/recommend/batch",
+        json={"movie_titles": ["Movie A", "Nope", "MOVIE C"], "n_recommendations": 2},
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["success", "error", "success"]
+    assert "not found" in results[1]["error"]
+
+    single, _ = app.content_based_recommend("MOVIE C", loaded_app, N=2)
+    assert results[2]["recommendations"] == single
+
+
+def test_lru_cache_eviction_and_ttl(monkeypatch):
+    from src.movieRecommendation.utils.cache import LRUCache
+
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 1, "misses": 1}
+
+    clock = [100.0]
+    monkeypatch.setattr("src.movieRecommendation.utils.cache.time.monotonic", lambda: clock[0])
+    expiring = LRUCache(max_size=2, ttl_seconds=10)
+    expiring.put("a", 1)
+    clock[0] += 11
+    assert expiring.get("a") is None
+
+
+def test_recommendations_are_cached_per_state(loaded_app, movies_df, embeddings):
+    first, _ = app.content_based_recommend("Movie A", loaded_app, N=2)
+    app.content_based_recommend("movie a", loaded_app, N=2)
+    assert loaded_app.cache.stats()["hits"] == 0  # different rows
+    third, _ = app.content_based_recommend("Movie A", loaded_app, N=2)
+    assert third is first
+    assert loaded_app.cache.stats()["hits"] == 1
+
+    # Swapping in new artifacts starts from an empty cache
+    reloaded = app.ServingState(movies_df, embeddings)
+    assert reloaded.cache.stats()["size"] == 0
+
+
+def test_content_based_recommend_uses_neighbor_table(movies_df, embeddings):
+    from fastapi.testclient import TestClient
+    from src.movieRecommendation.components.neighbor_table import NeighborTable
+
+    table = NeighborTable(
+        np.array([[2, 1], [0, 3], [3, 0], [0, 1]], dtype=np.int32),
+        np.array([[0.5, 0.4], [0.9, 0.8], [0.7, 0.6], [0.7, 0.6]], dtype=np.float16),
+    )
+    serving_state = app.ServingState(movies_df, embeddings, neighbor_table=table)
+    recommendations, _ = app.content_based_recommend("Movie A", serving_state, N=2)
+    # Served straight from the (deliberately fake) table
+    assert [r["title"] for r in recommendations] == ["Movie C", "Movie B"]
+
+    assert table.lookup(0, -1) is None
+    client = TestClient(app.app)
+    # Negative counts would slice from the end of the table
+    response = client.post("/recommend", params={"movie_title": "Movie A", "n_recommendations": -3})
+    assert response.status_code == 422
+    response = client.post(
+        "/recommend/batch", json={"movie_titles": ["Movie A"], "n_recommendations": -3}
+    )
+    assert response.status_code == 422
+
+    # Asking for more than K falls back to live scoring
+    recommendations, _ = app.content_based_recommend("Movie A", serving_state, N=3)
+    assert [r["title"] for r in recommendations] == ["Movie B", "movie a", "Movie C"]
+
+
+def test_load_state_serves_without_posters_when_ingestion_lacks_them(
+    tmp_path, monkeypatch, movies_df, embeddings
+):
+    movies_df[["title"]].to_parquet(tmp_path / "prepared.parquet", index=False)
+    movies_df[["title"]].to_parquet(tmp_path / "final.parquet", index=False)
+    np.save(tmp_path / "movie_embeddings.npy", embeddings)
+    monkeypatch.setattr(app, "MOVIE_DATA_PATH", str(tmp_path / "prepared.parquet"))
+    monkeypatch.setattr(app, "INGESTION_DATA_PATH", str(tmp_path / "final.parquet"))
+    monkeypatch.setattr(app, "SAVED_EMBEDDING_PATH", str(tmp_path / "movie_embeddings.npy"))
+    monkeypatch.setitem(app.SERVING_CONFIG, "neighbor_table_dir", str(tmp_path / "neighbor_table"))
+
+    serving_state = app.load_state()
+    assert serving_state is not None
+    assert serving_state.posters is None
+
+
+def test_batch_recommend_resolves_each_title_once_on_the_table_path(movies_df, embeddings):
+    from src.movieRecommendation.components.neighbor_table import NeighborTable
+
+    table = NeighborTable(
+        np.array([[2, 1], [0, 3], [3, 0], [0, 1]], dtype=np.int32),
+        np.array([[0.5, 0.4], [0.9, 0.8], [0.7, 0.6], [0.7, 0.6]], dtype=np.float16),
+    )
+    serving_state = app.ServingState(movies_df, embeddings, neighbor_table=table)
+    before = app.TITLE_LOOKUPS.value("found")
+    results = app.batch_content_based_recommend(["Movie A", "Movie C"], serving_state, N=2)
+    assert app.TITLE_LOOKUPS.value("found") == before + 2
+    assert [r["title"] for r in results[0]["recommendations"]] == ["Movie C", "Movie B"]
+    assert results[1]["status"] == "success"
+
+
+def test_training_runs_in_background_and_swaps_state(monkeypatch, movies_df, embeddings):
+    import sys
+    import time
+    from fastapi.testclient import TestClient
+
+    fake_pipeline = (
+        "print('>>>>>> Stage Fake Stage started <<<<<<');"
+        "print('>>>>>> Stage Fake Stage completed <<<<<<')"
+    )
+    new_state = app.ServingState(movies_df, embeddings)
+    monkeypatch.setattr(app, "TRAINING_COMMAND", [sys.executable, "-c", fake_pipeline])
+    monkeypatch.setattr(app, "load_state", lambda: new_state)
+    monkeypatch.setattr(app, "state", None)
+
+    client = TestClient(app.app)
+    response = client.get("/train")
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        job = client.get(f"/train/{job_id}").json()
+        if job["status"] != "running":
+            break
+        time.sleep(0.05)
+    assert job["status"] == "succeeded"
+    assert job["completed_stages"] == ["Fake Stage"]
+    assert app.state is new_state
+    assert client.get("/train/unknown").status_code == 404
+
+
+def test_movies_catalog_etag_gzip_and_pagination(loaded_app):
+    import gzip
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app.app)
+    response = client.get("/movies")
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == {
+        "movies": ["Movie A", "Movie B", "Movie C", "movie a"],
+        "status": "success",
+    }
+    etag = response.headers["etag"]
+    assert gzip.decompress(loaded_app.catalog.gzip_body) == loaded_app.catalog.json_body
+
+    assert client.get("/movies", headers={"If-None-Match": etag}).status_code == 304
+
+    # The identity body has its own strong validator, and either one revalidates
+    identity = client.get("/movies", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] != etag
+    revalidated = client.get(
+        "/movies", headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == identity.headers["etag"]
+
+    page = client.get("/movies", params={"prefix": "MOVIE", "offset": 1, "limit": 2}).json()
+    assert page["movies"] == ["movie a", "Movie B"]
+    assert page["total"] == 4
+    assert client.get("/movies", params={"prefix": "movie c"}).json()["movies"] == ["Movie C"]
+    assert client.get("/movies", params={"offset": -1}).status_code == 422
+
+
+def test_title_search_prefix_then_fuzzy():
+    from src.movieRecommendation.utils.title_search import TitleSearchIndex
+
+    titles = ["The Dark Knight", "The Darjeeling Limited", "Heat", "Inception", "Interstellar"]
+    keyed = sorted((title.lower(), title) for title in titles)
+    index = TitleSearchIndex([k for k, _ in keyed], [t for _, t in keyed])
+
+    results = index.search("the dar", limit=3)
+    assert [r["title"] for r in results[:2]] == ["The Darjeeling Limited", "The Dark Knight"]
+    assert all(r["match"] == "prefix" for r in results[:2])
+
+    # Typos only match through trigrams
+    assert index.search("Intersteller", limit=1)[0]["title"] == "Interstellar"
+    assert index.search("Incepshun", limit=1)[0]["title"] == "Inception"
+    assert index.search("zzzz") == []
+
+
+def test_search_endpoint_and_recommend_suggestions(loaded_app):
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app.app)
+    results = client.get("/search", params={"q": "Movie C"}).json()["results"]
+    assert results[0] == {"title": "Movie C", "score": 1.0, "match": "prefix"}
+
+    response = client.post("/recommend", params={"movie_title": "Movei B"})
+    assert response.status_code == 404
+    assert "Movie B" in response.json()["suggestions"]
+
+
+def test_metrics_endpoint_exposes_request_and_recommend_metrics(loaded_app):
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app.app)
+    before = app.RECOMMEND_LATENCY.count("exact")
+    client.post("/recommend", params={"movie_title": "Movie A"})
+    client.post("/recommend", params={"movie_title": "Movie A"})
+    client.get(f"/train/{'x' * 8}")
+    assert app.RECOMMEND_LATENCY.count("exact") == before + 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_requests_total{method="POST",route="/recommend",status="200"}' in body
+    # Path parameters are reported by their route template
+    assert 'route="/train/{job_id}"' in body
+    assert 'recommend_duration_seconds_bucket{source="cache",le="+Inf"}' in body
+    assert "catalog_movies 4.0" in body
+    assert "recommendation_cache_hits 1.0" in body
+
+
+def test_histogram_buckets_are_cumulative():
+    from src.movieRecommendation.utils.metrics import MetricsRegistry
+
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{le="0.1"} 2.0' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 3.0' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4.0' in lines
+    assert "latency_seconds_count 4.0" in lines
+
+
+def test_import_is_lazy_and_health_gates_on_readiness(monkeypatch, movies_df, embeddings):
+    import subprocess
+    import sys
+    import time
+    from fastapi.testclient import TestClient
+
+    # Importing app neither loads artifacts nor pulls in pandas
+    probe = "import sys, app; print(app.state is None, 'pandas' in sys.modules)"
+    output = subprocess.check_output([sys.executable, "-c", probe], text=True)
+    assert output.split()[-2:] == ["True", "False"]
+
+    monkeypatch.setattr(app, "state", None)
+    monkeypatch.setattr(app, "readiness", {"status": "starting", "load_seconds": None})
+    client = TestClient(app.app)
+    response = client.get("/health")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+    assert client.get("/health/live").status_code == 200
+
+    # The lifespan hook loads in the background; /health flips to 200 once warmed
+    monkeypatch.setattr(app, "load_state", lambda: app.ServingState(movies_df, embeddings))
+    with TestClient(app.app) as client:
+        for _ in range(100):
+            response = client.get("/health")
+            if response.status_code == 200:
+                break
+            time.sleep(0.05)
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert client.post("/recommend", params={"movie_title": "Movie A"}).status_code == 200
+
+
+def test_worker_count_setting_and_training_is_refused_with_several_workers(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    assert app.resolve_worker_count("3") == 3
+    assert app.resolve_worker_count(0) == 1
+    assert app.resolve_worker_count("auto") >= 1
+
+    monkeypatch.setitem(app.SERVING_CONFIG, "workers", 4)
+    response = TestClient(app.app).get("/train")
+    assert response.status_code == 409
+    assert "job_id" not in response.json()
+
+
+def test_title_search_scores_full_overlap_when_common_trigrams_are_pruned():
+    from src.movieRecommendation.utils.title_search import TitleSearchIndex
+
+    titles = [f"Love Story {i}" for i in range(6000)]
+    keyed = sorted((title.lower(), title) for title in titles)
+    index = TitleSearchIndex([k for k, _ in keyed], [t for _, t in keyed], max_postings=5000)
+    # "lov", "sto", ... are shared by every title, so only the digits pick candidates
+    assert len(index.postings("lov")) > index.max_postings
+
+    results = index.search("Lvoe Story 12", limit=1)
+    assert results[0]["title"] == "Love Story 12"
+    unpruned = TitleSearchIndex(index.keys, index.titles, max_postings=10**6)
+    assert results == unpruned.search("Lvoe Story 12", limit=1)
+
+
+def test_auto_worker_count_honours_the_cgroup_cpu_quota(tmp_path, monkeypatch):
+    cpu_max = tmp_path / "cpu.max"
+    monkeypatch.setattr(app, "CGROUP_CPU_MAX_PATH", str(cpu_max))
+    monkeypatch.setattr(app.os, "sched_getaffinity", lambda pid: set(range(64)), raising=False)
+
+    cpu_max.write_text("200000 100000\n")
+    assert app.cgroup_cpu_limit() == 2.0
+    assert app.resolve_worker_count("auto") == 2
+    cpu_max.write_text("50000 100000\n")
+    assert app.resolve_worker_count("auto") == 1
+
+    cpu_max.write_text("max 100000\n")
+    assert app.cgroup_cpu_limit() is None
+    assert app.resolve_worker_count("auto") == 64
+
+
+def test_derived_artifacts_are_rejected_after_retraining_with_the_same_row_count(
+    tmp_path, monkeypatch
+):
+    from src.movieRecommendation.components.ann_index import IVFFlatIndex
+    from src.movieRecommendation.components.neighbor_table import NeighborTableBuilder
+    from src.movieRecommendation.utils.embeddings import (
+        load_embeddings,
+        read_embeddings_digest,
+        save_embeddings,
+    )
+
+    embeddings_path = str(tmp_path / "movie_embeddings.npy")
+    rng = np.random.default_rng(3)
+    save_embeddings(rng.normal(size=(12, 4)), embeddings_path)
+    config = MagicMock()
+    config.root_dir = str(tmp_path / "neighbor_table")
+    config.embeddings_path = embeddings_path
+    config.top_k = 3
+    config.row_block_size = 8
+    config.column_chunk_size = 8
+    os.makedirs(config.root_dir)
+    NeighborTableBuilder(config).build()
+    index = IVFFlatIndex.build(load_embeddings(embeddings_path), n_lists=2)
+    index.source_digest = read_embeddings_digest(embeddings_path)
+    index.save(tmp_path / "ivf_flat.npz")
+    monkeypatch.setitem(app.SERVING_CONFIG, "neighbor_table_dir", config.root_dir)
+    monkeypatch.setitem(app.SERVING_CONFIG, "search_mode", "approximate")
+    monkeypatch.setitem(app.SERVING_CONFIG, "ann_index_path", str(tmp_path / "ivf_flat.npz"))
+
+    digest = read_embeddings_digest(embeddings_path)
+    assert app.load_neighbor_table(12, digest) is not None
+    assert app.load_ann_index(12, digest) is not None
+
+    # Only the trainer reran: same catalog size, different vectors
+    save_embeddings(rng.normal(size=(12, 4)), embeddings_path)
+    digest = read_embeddings_digest(embeddings_path)
+    assert app.load_neighbor_table(12, digest) is None
+    assert app.load_ann_index(12, digest) is None
+    # Artifacts from before digests were recorded are not trusted either
+    assert app.load_neighbor_table(12, None) is None
+
+
+def test_retraining_to_a_smaller_catalog_leaves_the_serving_state_intact(tmp_path, monkeypatch):
+    import sys
+    import time
+    import textwrap
+    import subprocess
+    from fastapi.testclient import TestClient
+
+    # A fake pipeline that rewrites every mapped artifact with fewer movies
+    pipeline = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {os.path.dirname(os.path.abspath(app.__file__))!r})
+        from unittest.mock import MagicMock
+        import numpy as np
+        import pandas as pd
+        from src.movieRecommendation.components.neighbor_table import NeighborTableBuilder
+        from src.movieRecommendation.utils.embeddings import save_embeddings
+
+        def build(root, n_rows, seed):
+            pd.DataFrame({{"title": [f"Movie {{i}}" for i in range(n_rows)]}}).to_parquet(
+                f"{{root}}/prepared.parquet", index=False
+            )
+            save_embeddings(np.random.default_rng(seed).normal(size=(n_rows, 8)), f"{{root}}/emb.npy")
+            config = MagicMock(root_dir=root, embeddings_path=f"{{root}}/emb.npy", top_k=5,
+                               row_block_size=64, column_chunk_size=64)
+            NeighborTableBuilder(config).build()
+
+        build(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))
+    """)
+    script = tmp_path / "pipeline.py"
+    script.write_text(pipeline)
+    root = str(tmp_path)
+    monkeypatch.setattr(app, "MOVIE_DATA_PATH", os.path.join(root, "prepared.parquet"))
+    monkeypatch.setattr(app, "INGESTION_DATA_PATH", os.path.join(root, "final.parquet"))
+    monkeypatch.setattr(app, "SAVED_EMBEDDING_PATH", os.path.join(root, "emb.npy"))
+    monkeypatch.setitem(app.SERVING_CONFIG, "neighbor_table_dir", root)
+    monkeypatch.setitem(app.SERVING_CONFIG, "cache_size", 0)
+
+    subprocess.run([sys.executable, str(script), root, "400", "1"], check=True)
+    old_state = app.load_state()
+    assert old_state.neighbor_table is not None
+    monkeypatch.setattr(app, "state", old_state)
+    expected, _ = app.content_based_recommend("Movie 399", old_state, N=5)
+
+    monkeypatch.setattr(app, "TRAINING_COMMAND", [sys.executable, str(script), root, "50", "2"])
+    client = TestClient(app.app)
+    job_id = client.get("/train").json()["job_id"]
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        # The old state keeps serving its own vectors and table while files are replaced
+        recommendations, error = app.content_based_recommend("Movie 399", old_state, N=5)
+        assert error is None and recommendations == expected
+        if client.get(f"/train/{job_id}").json()["status"] != "running":
+            break
+    assert client.get(f"/train/{job_id}").json()["status"] == "succeeded"
+    assert len(app.state.titles) == 50 and app.state.neighbor_table is not None
+    # Every page of the old mappings is still readable after the swap
+    assert float(np.abs(old_state.embeddings).sum()) > 0
+    assert int(np.asarray(old_state.neighbor_table.indices).max()) == 399
+    assert app.content_based_recommend("Movie 399", old_state, N=5)[0] == expected
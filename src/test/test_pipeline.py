@@ -111,10 +111,14 @@ def test_model_trainer_logic(tmp_path):
     config.model_name = "dummy-model"
     config.data_path = str(tmp_path)
     config.root_dir = str(tmp_path)
+    config.embedding_store_dir = str(tmp_path / "embedding_store")
+    config.checkpoint_dir = str(tmp_path / "checkpoint")
+    config.batch_size = 2
+    config.checkpoint_every = 1
     
     # Prepare dummy data
     df = pd.DataFrame({"cleaned_description": ["test one", "test two"]})
-    df.to_csv(tmp_path / "prepared.csv", index=False)
+    df.to_parquet(tmp_path / "prepared.parquet", index=False)
     
     # Mock the embedding model
     with MagicMock() as mock_hf:
@@ -127,11 +131,525 @@ def test_model_trainer_logic(tmp_path):
         
         trainer.train()
         
-        # Verify pkl was created
-        pkl_path = tmp_path / "movie_embeddings.pkl"
-        assert pkl_path.exists()
-        
-        with open(pkl_path, "rb") as f:
-            emb = pickle.load(f)
-            assert emb.shape == (2, 2)
-            assert np.array_equal(emb, np.array([[0.1, 0.2], [0.3, 0.4]]))
+        # Verify npy was created with normalized float32 rows
+        npy_path = tmp_path / "movie_embeddings.npy"
+        assert npy_path.exists()
+
+        emb = np.load(npy_path)
+        assert emb.shape == (2, 2)
+        assert emb.dtype == np.float32
+        expected = np.array([[0.1, 0.2], [0.3, 0.4]])
+        expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+        np.testing.assert_allclose(emb, expected, rtol=1e-6)
+
+def test_load_embeddings_mmap_and_pickle_fallback(tmp_path):
+    from src.movieRecommendation.utils.embeddings import load_embeddings, save_embeddings
+
+    raw = np.array([[3.0, 4.0], [0.0, 2.0]])
+    with open(tmp_path / "movie_embeddings.pkl", "wb") as f:
+        pickle.dump(raw, f)
+    npy_path = tmp_path / "movie_embeddings.npy"
+
+    # Only the legacy pickle exists
+    legacy = load_embeddings(npy_path)
+    np.testing.assert_allclose(legacy, [[0.6, 0.8], [0.0, 1.0]], rtol=1e-6)
+
+    save_embeddings(raw, npy_path)
+    mapped = load_embeddings(npy_path)
+    assert isinstance(mapped.base, np.memmap)
+    assert not mapped.flags.writeable
+    np.testing.assert_array_equal(mapped, legacy)
+
+    with pytest.raises(FileNotFoundError):
+        load_embeddings(tmp_path / "missing.npy")
+
+def test_save_embeddings_leaves_existing_mappings_on_the_old_file(tmp_path):
+    from src.movieRecommendation.utils.embeddings import load_embeddings, save_embeddings
+
+    path = tmp_path / "movie_embeddings.npy"
+    save_embeddings(np.eye(4), path)
+    mapped = load_embeddings(path)
+
+    # A smaller catalog replaces the file; the old mapping must stay readable and unchanged
+    save_embeddings(np.ones((2, 4)), path)
+    np.testing.assert_array_equal(mapped, np.eye(4, dtype=np.float32))
+    assert load_embeddings(path).shape == (2, 4)
+    assert not os.path.exists(str(path) + ".tmp")
+
+
+def test_ivf_flat_index_search(tmp_path):
+    from src.movieRecommendation.components.ann_index import IVFFlatIndex
+    from src.movieRecommendation.utils.embeddings import normalize_embeddings, top_k_indices
+
+    embeddings = normalize_embeddings(np.random.default_rng(0).normal(size=(500, 16)))
+    index = IVFFlatIndex.build(embeddings, n_lists=10, n_iter=5)
+    assert index.n_rows == 500
+    assert sorted(index.ids.tolist()) == list(range(500))
+
+    # Probing every list is an exhaustive search
+    query = embeddings[7]
+    found, scores = index.search(embeddings, query, 5, n_probe=10)
+    np.testing.assert_array_equal(found, top_k_indices(embeddings @ query, 5))
+    assert found[0] == 7
+
+    index.save(tmp_path / "ivf_flat.npz")
+    loaded = IVFFlatIndex.load(tmp_path / "ivf_flat.npz")
+    np.testing.assert_array_equal(loaded.ids, index.ids)
+    np.testing.assert_array_equal(loaded.offsets, index.offsets)
+
+def test_neighbor_table_matches_brute_force():
+    from src.movieRecommendation.components.neighbor_table import NeighborTableBuilder
+    from src.movieRecommendation.utils.embeddings import normalize_embeddings, top_k_indices
+
+    embeddings = normalize_embeddings(np.random.default_rng(1).normal(size=(100, 8)))
+    config = MagicMock()
+    config.top_k = 5
+    # Small blocks so several row blocks and column chunks are merged
+    config.row_block_size = 16
+    config.column_chunk_size = 30
+
+    table = NeighborTableBuilder(config).compute(embeddings)
+    assert table.indices.shape == (100, 5)
+    assert table.indices.dtype == np.int32
+    assert table.scores.dtype == np.float16
+    for row in (0, 42, 99):
+        sims = embeddings @ embeddings[row]
+        expected = top_k_indices(sims, 6)[1:]
+        np.testing.assert_array_equal(table.indices[row], expected)
+        np.testing.assert_allclose(table.scores[row], sims[expected], atol=1e-3)
+    assert table.lookup(0, 6) is None
+
+def test_neighbor_table_rebuild_leaves_a_loaded_table_intact(tmp_path):
+    from src.movieRecommendation.components.neighbor_table import NeighborTable, NeighborTableBuilder
+    from src.movieRecommendation.utils.embeddings import save_embeddings
+
+    config = MagicMock()
+    config.root_dir = str(tmp_path)
+    config.embeddings_path = str(tmp_path / "movie_embeddings.npy")
+    config.top_k = 3
+    config.row_block_size = 8
+    config.column_chunk_size = 8
+    rng = np.random.default_rng(2)
+    save_embeddings(rng.normal(size=(20, 4)), config.embeddings_path)
+    NeighborTableBuilder(config).build()
+    loaded = NeighborTable.load(tmp_path)
+    before = np.array(loaded.indices)
+
+    save_embeddings(rng.normal(size=(5, 4)), config.embeddings_path)
+    NeighborTableBuilder(config).build()
+    np.testing.assert_array_equal(loaded.indices, before)
+    assert NeighborTable.load(tmp_path).n_rows == 5
+
+
+def test_data_preparation_parallel_matches_serial():
+    config = MagicMock()
+    config.n_workers = 1
+    config.chunk_size = 2
+
+    preparator = DataPreparation(config)
+    texts = [
+        "Hello World! 123. Running runners.",
+        "The movies are great fun-filled adventures",
+        "A heist in 1995 goes wrong",
+        "Cats and dogs living together",
+        "",
+    ]
+    serial = preparator.clean_descriptions(texts)
+    assert serial[1] == preparator.remove_stop_words(
+        preparator.lemmatize_text(
+            preparator.remove_numbers(
+                preparator.remove_punctuation(preparator.make_lower_case(texts[1]))
+            )
+        )
+    )
+
+    config.n_workers = 2
+    assert preparator.clean_descriptions(texts) == serial
+
+def test_streaming_preparation_reuses_one_worker_pool(tmp_path, monkeypatch):
+    from src.movieRecommendation.components import data_preparation
+
+    pools = []
+
+    class InlinePool:
+        def __init__(self, max_workers, initializer):
+            pools.append(self)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def map(self, fn, chunks):
+            return [fn(chunk) for chunk in chunks]
+
+    monkeypatch.setattr(data_preparation, "ProcessPoolExecutor", InlinePool)
+    monkeypatch.setattr(data_preparation, "_clean_chunk", lambda texts: [t.upper() for t in texts])
+    pd.DataFrame({"title": list("abcdef"), "concat_description": list("abcdef")}).to_parquet(
+        tmp_path / "transformed.parquet", index=False
+    )
+    config = MagicMock()
+    config.data_path = str(tmp_path)
+    config.root_dir = str(tmp_path)
+    config.n_workers = 2
+    config.chunk_size = 1
+    config.streaming = True
+    config.stream_chunk_size = 2
+    DataPreparation(config).prepare()
+
+    assert len(pools) == 1
+    prepared = pd.read_parquet(tmp_path / "prepared.parquet")
+    assert prepared["cleaned_description"].tolist() == list("ABCDEF")
+
+
+def test_fused_cleaner_matches_step_by_step():
+    config = MagicMock()
+    preparator = DataPreparation(config)
+    texts = [
+        "Hello World! 123. Running runners.",
+        "You cannot stop--the 2nd fun-filled heists, gonna be great!!",
+        "Crème brûlée _under_score 42nd-street; the end.",
+    ]
+    for text in texts:
+        expected = preparator.remove_stop_words(
+            preparator.lemmatize_text(
+                preparator.remove_numbers(
+                    preparator.remove_punctuation(preparator.make_lower_case(text))
+                )
+            )
+        )
+        assert preparator.clean_description(text) == expected
+    # Repeated tokens are served from the lemma cache
+    assert "runners" in preparator._token_cache
+
+def test_vectorized_transformation_matches_row_wise():
+    transformer = DataTransformation(MagicMock())
+    genres = pd.Series([
+        "['Action', 'Sci-Fi']",
+        '[ "Drama" ,\t"Crime  " ]',
+        "[]",
+        "['It\\'s']",
+        "['Comedy', 1]",
+        "Action, Sci-Fi",
+        "['a\xa0b']",
+        "",
+        np.nan,
+    ], dtype=object)
+    expected = genres.apply(transformer.clean_genres)
+    assert transformer.clean_genres_column(genres).tolist() == expected.tolist()
+
+    df = pd.DataFrame({
+        "genres": [" Action ,Comedy ", "", "Drama"],
+        "concat_description": ["A great movie.", "Plot", "Story"],
+    })
+    expected = df.apply(transformer.weight_description, axis=1)
+    assert transformer.weight_descriptions(df).tolist() == expected.tolist()
+
+
+def test_model_trainer_only_embeds_new_or_changed_rows(tmp_path):
+    from src.movieRecommendation.components.model_trainer import ModelTrainer
+
+    config = MagicMock()
+    config.model_name = "dummy-model"
+    config.data_path = str(tmp_path)
+    config.root_dir = str(tmp_path)
+    config.embedding_store_dir = str(tmp_path / "embedding_store")
+    config.checkpoint_dir = str(tmp_path / "checkpoint")
+    config.batch_size = 2
+    config.checkpoint_every = 1
+    vectors = {"one": [1.0, 0.0], "two": [0.0, 1.0], "three": [1.0, 1.0], "2": [2.0, 1.0]}
+    embedding = MagicMock()
+    embedding.embed_documents.side_effect = lambda texts: [vectors[t] for t in texts]
+    trainer = ModelTrainer(config)
+    trainer.load_hf_embedding = MagicMock(return_value=embedding)
+
+    pd.DataFrame({"cleaned_description": ["one", "two", "one"]}).to_parquet(
+        tmp_path / "prepared.parquet", index=False
+    )
+    trainer.train()
+    assert embedding.embed_documents.call_args.args[0] == ["one", "two"]
+
+    # "two" changed to "2" and "three" was added; only those are embedded
+    pd.DataFrame({"cleaned_description": ["three", "one", "2"]}).to_parquet(
+        tmp_path / "prepared.parquet", index=False
+    )
+    trainer.train()
+    assert embedding.embed_documents.call_args.args[0] == ["2", "three"]
+
+    emb = np.load(tmp_path / "movie_embeddings.npy")
+    expected = np.array([vectors["three"], vectors["one"], vectors["2"]])
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    np.testing.assert_allclose(emb, expected, rtol=1e-6)
+
+    # A third run with nothing new never loads the model
+    trainer.load_hf_embedding.reset_mock()
+    trainer.train()
+    trainer.load_hf_embedding.assert_not_called()
+
+
+def test_embedding_store_handles_a_model_of_another_dimension():
+    from src.movieRecommendation.utils.embedding_store import EmbeddingStore, content_key
+
+    texts = ["one", "two", "three"]
+    old_keys = [content_key("small-model", t) for t in texts]
+    store = EmbeddingStore(np.array(old_keys, dtype="S32"), np.ones((3, 4), dtype=np.float32))
+
+    # Every key misses for the new model, whose vectors are wider
+    keys = [content_key("wide-model", t) for t in texts]
+    matrix, n_embedded = store.assemble(keys, lambda positions: np.full((len(positions), 8), 2.0))
+    assert matrix.shape == (3, 8) and n_embedded == 3
+    assert (matrix == 2.0).all()
+
+    # A store whose vectors disagree in width with fresh ones is re-embedded in full
+    mixed = old_keys[:2] + [content_key("small-model", "four")]
+    matrix, n_embedded = store.assemble(mixed, lambda positions: np.full((len(positions), 8), 3.0))
+    assert matrix.shape == (3, 8) and n_embedded == 3
+    assert (matrix == 3.0).all()
+
+
+def test_model_trainer_resumes_embedding_from_checkpoint(tmp_path):
+    from src.movieRecommendation.components.model_trainer import ModelTrainer
+
+    config = MagicMock()
+    config.model_name = "dummy-model"
+    config.checkpoint_dir = str(tmp_path / "checkpoint")
+    config.batch_size = 2
+    config.checkpoint_every = 1
+    trainer = ModelTrainer(config)
+    texts = ["ccc", "a", "bbbbb", "dd", "e"]
+    embedded = []
+
+    def embed(batch):
+        if len(embedded) == 2:
+            raise RuntimeError("interrupted")
+        embedded.append(batch)
+        return [[len(text), 1.0] for text in batch]
+
+    embedding = MagicMock()
+    embedding.embed_documents.side_effect = embed
+    with pytest.raises(RuntimeError):
+        trainer.embed_documents(embedding, texts)
+    # Batches go shortest first
+    assert embedded == [["a", "e"], ["dd", "ccc"]]
+
+    embedding.embed_documents.side_effect = lambda batch: [[len(t), 1.0] for t in batch]
+    vectors = trainer.embed_documents(embedding, texts)
+    # Only the last batch is embedded after the resume
+    assert embedding.embed_documents.call_args_list[-1].args[0] == ["bbbbb"]
+    assert embedding.embed_documents.call_count == 4
+    assert vectors.dtype == np.float32
+    np.testing.assert_array_equal(vectors[:, 0], [3, 1, 5, 2, 1])
+
+
+def test_read_table_projects_columns_and_falls_back_to_csv(tmp_path):
+    from src.movieRecommendation.utils.tables import read_table, write_table
+
+    df = pd.DataFrame({"title": ["A", "B"], "poster_path": ["/a", None], "overview": ["x", "y"]})
+    write_table(df, tmp_path / "final.parquet")
+    loaded = read_table(tmp_path / "final.parquet", columns=["title", "poster_path"])
+    assert list(loaded.columns) == ["title", "poster_path"]
+    assert loaded["title"].tolist() == ["A", "B"]
+
+    # Artifacts from runs that still wrote CSV are read through the same call
+    df.to_csv(tmp_path / "legacy.csv", index=False)
+    assert list(read_table(tmp_path / "legacy.parquet", columns=["title"]).columns) == ["title"]
+    with pytest.raises(FileNotFoundError):
+        read_table(tmp_path / "missing.parquet")
+
+
+def test_main_skips_unchanged_stages_and_honours_cli(tmp_path, monkeypatch):
+    import main
+    from src.movieRecommendation.utils import tables
+
+    source = tmp_path / "source.txt"
+    source.write_text("v1")
+    runs = []
+
+    def make_stage(key, inputs, output):
+        def run():
+            runs.append(key)
+            (tmp_path / output).write_text(key)
+        return main.Stage(key, key, run, {"params": 1}, inputs, [tmp_path / output], [tables])
+
+    stages = [
+        make_stage("first", [source], "first.out"),
+        make_stage("second", [tmp_path / "first.out"], "second.out"),
+    ]
+    config_manager = MagicMock()
+    config_manager.config.stage_cache_path = str(tmp_path / "stage_cache.json")
+    config_manager.config.run_report_dir = str(tmp_path / "run_reports")
+    monkeypatch.setattr(main, "ConfigurationManager", lambda: config_manager)
+    monkeypatch.setattr(main, "build_stages", lambda _: stages)
+
+    main.main([])
+    assert runs == ["first", "second"]
+    main.main([])
+    assert runs == ["first", "second"]
+
+    # A changed input re-runs its stage; the unchanged output keeps the next one cached
+    source.write_text("v2")
+    main.main([])
+    assert runs == ["first", "second", "first"]
+
+    main.main(["--only", "second"])
+    main.main(["--from-stage", "first"])
+    assert runs == ["first", "second", "first", "second", "first", "second"]
+
+    # A missing output is never treated as up to date
+    (tmp_path / "second.out").unlink()
+    main.main([])
+    assert runs[-1] == "second"
+
+
+def test_main_fingerprints_the_data_file_ingestion_downloads(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+    import main
+    from src.movieRecommendation.constants import CONFIG_FILE_PATH, PARAMS_FILE_PATH
+    from src.movieRecommendation.utils.common import read_yaml
+
+    config_manager = SimpleNamespace(
+        config=read_yaml(CONFIG_FILE_PATH), params=read_yaml(PARAMS_FILE_PATH)
+    )
+    ingestion = main.build_stages(config_manager)[0]
+    assert ingestion.inputs == [config_manager.config.data_ingestion.local_data_file]
+
+    archive = tmp_path / "data.zip"
+    runs = []
+
+    def run():
+        runs.append("ingest")
+        if not archive.exists():
+            archive.write_text("v1")
+        (tmp_path / "final.parquet").write_text("rows")
+
+    stage = main.Stage(
+        "data_ingestion", "ingest", run, {}, [archive], [tmp_path / "final.parquet"], [main]
+    )
+    config_manager = MagicMock()
+    config_manager.config.stage_cache_path = str(tmp_path / "stage_cache.json")
+    config_manager.config.run_report_dir = str(tmp_path / "run_reports")
+    monkeypatch.setattr(main, "ConfigurationManager", lambda: config_manager)
+    monkeypatch.setattr(main, "build_stages", lambda _: [stage])
+
+    # The archive the first run downloads is what the next run compares against
+    main.main([])
+    main.main([])
+    assert runs == ["ingest"]
+
+    archive.write_text("v2")
+    main.main([])
+    assert runs == ["ingest", "ingest"]
+
+def test_streaming_ingestion_and_transformation_match_in_memory(tmp_path, sample_raw_data):
+    import zipfile
+    from src.movieRecommendation.components.data_ingestion import DataIngestion
+    from src.movieRecommendation.utils.tables import read_table
+
+    raw = pd.concat([sample_raw_data] * 3, ignore_index=True)
+    raw["genres"] = ["['Action', 'Comedy']", "['Drama']"] * 3
+    # Missing in the first chunk only; must still be typed as text
+    raw["poster_path"] = [None, None, "/a", "/b", "/c", "/d"]
+    zip_path = tmp_path / "data.zip"
+    with zipfile.ZipFile(zip_path, "w") as zip_ref:
+        zip_ref.writestr("data/final.csv", raw.to_csv(index=False))
+
+    config = MagicMock()
+    config.local_data_file = str(zip_path)
+    config.unzip_dir = str(tmp_path / "ingested")
+    config.stream_chunk_size = 2
+    DataIngestion(config).stream_to_parquet()
+    ingested = read_table(tmp_path / "ingested" / "final.parquet")
+    assert len(ingested) == 6
+    assert ingested["poster_path"].tolist()[2:] == ["/a", "/b", "/c", "/d"]
+    assert not (tmp_path / "ingested" / "final.csv").exists()
+
+    outputs = {}
+    for streaming in (False, True):
+        config = MagicMock()
+        config.data_path = str(tmp_path / "ingested")
+        config.root_dir = str(tmp_path / f"streaming_{streaming}")
+        config.streaming = streaming
+        config.stream_chunk_size = 4
+        os.makedirs(config.root_dir)
+        DataTransformation(config).transform()
+        outputs[streaming] = read_table(os.path.join(config.root_dir, "transformed.parquet"))
+    pd.testing.assert_frame_equal(outputs[True], outputs[False])
+
+
+def test_streaming_ingestion_keeps_one_schema_across_chunks(tmp_path):
+    import zipfile
+    from src.movieRecommendation.components.data_ingestion import DataIngestion
+    from src.movieRecommendation.utils.tables import read_table
+
+    csv = "\n".join([
+        "code,rating,count,flag",
+        "1,,5,True",
+        "2,,6,False",
+        "abc,7.5,,True",
+        "4,8.0,8,False",
+    ])
+    zip_path = tmp_path / "data.zip"
+    with zipfile.ZipFile(zip_path, "w") as zip_ref:
+        zip_ref.writestr("final.csv", csv)
+
+    config = MagicMock()
+    config.local_data_file = str(zip_path)
+    config.unzip_dir = str(tmp_path / "ingested")
+    config.stream_chunk_size = 2
+    DataIngestion(config).stream_to_parquet()
+    ingested = read_table(tmp_path / "ingested" / "final.parquet")
+    # Integers then text, all-missing then floats, integers then a gap
+    assert ingested["code"].tolist() == ["1", "2", "abc", "4"]
+    assert ingested["rating"].tolist()[2:] == [7.5, 8.0]
+    assert ingested["rating"].isna().tolist()[:2] == [True, True]
+    assert ingested["count"].dtype == np.float64
+    assert ingested["flag"].tolist() == [True, False, True, False]
+
+
+def test_run_profiler_reports_stages_and_steps(tmp_path):
+    import json
+    from src.movieRecommendation.utils.profiling import RunProfiler, timed_step
+
+    profiler = RunProfiler(tmp_path, profile=True)
+    with profiler.stage("first", "First Stage"):
+        for _ in range(2):
+            with timed_step("work"):
+                sum(range(10000))
+    profiler.skip("second", "Second Stage")
+    with pytest.raises(ValueError):
+        with profiler.stage("third", "Third Stage"):
+            raise ValueError("boom")
+
+    with open(tmp_path / "latest.json") as f:
+        report = json.load(f)
+    first, second, third = report["stages"]
+    assert first["status"] == "completed"
+    assert first["steps"]["work"]["calls"] == 2
+    assert first["wall_seconds"] >= first["steps"]["work"]["wall_seconds"]
+    assert os.path.exists(first["profile_path"])
+    assert second["status"] == "skipped"
+    assert third["status"] == "failed"
+    assert (tmp_path / f"{profiler.run_id}.json").exists()
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/clear_refs"), reason="Linux only")
+def test_run_profiler_reports_the_peak_of_each_stage_and_step(tmp_path):
+    from src.movieRecommendation.utils.profiling import RunProfiler, timed_step
+
+    profiler = RunProfiler(tmp_path)
+    with profiler.stage("heavy", "Heavy Stage"):
+        with timed_step("allocate"):
+            block = np.ones(64 * 2**20 // 8)
+            del block
+        with timed_step("small"):
+            sum(range(1000))
+    with profiler.stage("light", "Light Stage"):
+        sum(range(1000))
+
+    heavy, light = profiler.report["stages"]
+    # The 64 MiB block shows up in its own step and stage, not in the ones after it
+    assert heavy["steps"]["allocate"]["peak_rss_mb"] >= heavy["steps"]["small"]["peak_rss_mb"] + 48
+    assert heavy["peak_rss_mb"] >= heavy["steps"]["allocate"]["peak_rss_mb"]
+    assert heavy["peak_rss_mb"] >= light["peak_rss_mb"] + 48
+    assert profiler.report["total"]["peak_rss_mb"] >= heavy["peak_rss_mb"]
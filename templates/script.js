@@ -125,8 +125,14 @@ document.addEventListener('DOMContentLoaded', () => {
 
         try {
             const response = await fetch('/train');
-            const data = await response.json();
-            alert(data.message);
+            let job = await response.json();
+            // Training runs in the background; poll the job until it finishes
+            while (job.status === 'running') {
+                await new Promise(resolve => setTimeout(resolve, 5000));
+                const statusResponse = await fetch(`/train/${job.job_id}`);
+                job = await statusResponse.json();
+            }
+            alert(job.message);
             fetchAllMovies(); // Refresh list after training
         } catch (error) {
             alert('Training failed: ' + error.message);